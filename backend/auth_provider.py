@@ -0,0 +1,68 @@
+"""Async client for the OAuth provider's session-data exchange."""
+import asyncio
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+SESSION_DATA_PATH = "/auth/v1/env/oauth/session-data"
+
+
+class AuthProviderError(Exception):
+    """The provider rejected the session id (status_code set) or was unreachable."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class AuthProviderClient:
+    """Shared keep-alive HTTP client with timeouts and bounded retries.
+
+    Transport errors and 5xx responses are retried with exponential backoff;
+    4xx responses mean the session id is bad and fail immediately.
+    """
+
+    def __init__(self, base_url, connect_timeout=3.0, read_timeout=10.0, retries=2,
+                 backoff=0.2, max_connections=100):
+        self.base_url = base_url.rstrip("/")
+        self.retries = retries
+        self.backoff = backoff
+        self._timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._limits = httpx.Limits(max_connections=max_connections,
+                                    max_keepalive_connections=max_connections)
+        self._client = None
+
+    async def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self._timeout,
+                                             limits=self._limits)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_session_data(self, session_id):
+        await self.start()
+        attempt = 0
+        while True:
+            try:
+                response = await self._client.get(SESSION_DATA_PATH, headers={"X-Session-ID": session_id})
+            except httpx.TransportError as e:
+                error = AuthProviderError(f"Auth provider unreachable: {e!r}")
+            else:
+                if response.status_code < 400:
+                    return response.json()
+                if response.status_code < 500:
+                    raise AuthProviderError(f"Auth provider rejected session: {response.status_code}",
+                                            status_code=response.status_code)
+                error = AuthProviderError(f"Auth provider error: {response.status_code}",
+                                          status_code=response.status_code)
+
+            if attempt >= self.retries:
+                raise error
+            attempt += 1
+            logger.warning(f"{error}; retrying ({attempt}/{self.retries})")
+            await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
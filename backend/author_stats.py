@@ -0,0 +1,105 @@
+"""Per-author aggregates for profile pages, in the `author_stats` collection.
+
+One document per username: post_count, total_views, total_likes and
+last_published_at over the author's published blogs. Likes are applied with
+$inc as they happen. Creating, publishing, unpublishing or deleting a post
+recomputes that author from the author_feed_v2 index. Views are written in
+bulk by the view counter and are picked up, together with any drift, by a
+periodic full pass (AUTHOR_STATS_REFRESH_INTERVAL), or by hand:
+
+    python author_stats.py
+"""
+import argparse
+import logging
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+from cli import run_with_db
+
+logger = logging.getLogger(__name__)
+
+EMPTY_STATS = {"post_count": 0, "total_views": 0, "total_likes": 0, "last_published_at": None}
+
+
+class AuthorStats:
+    def __init__(self, db, batch_size=500):
+        self.db = db
+        self.collection = db.author_stats
+        self.batch_size = batch_size
+
+    async def get(self, username):
+        stats = await self.collection.find_one({"_id": username}, {"_id": 0, "computed_at": 0})
+        if stats is None:
+            # Not reached by a full pass yet; computed but left for the pass to store
+            return (await self._aggregate([username]))[username]
+        return {**EMPTY_STATS, **stats}
+
+    async def add_likes(self, username, delta):
+        # No upsert: a missing document means the author is computed on read instead
+        await self.collection.update_one({"_id": username}, {"$inc": {"total_likes": delta}})
+
+    def _pipeline(self, match):
+        return [
+            {"$match": {**match, "is_published": True}},
+            {"$group": {
+                "_id": "$username",
+                "post_count": {"$sum": 1},
+                "total_views": {"$sum": "$views"},
+                "total_likes": {"$sum": "$likes"},
+                "last_published_at": {"$max": "$created_at"},
+            }},
+        ]
+
+    async def _aggregate(self, usernames):
+        rows = await self.db.blogs.aggregate(self._pipeline({"username": {"$in": list(usernames)}})).to_list(None)
+        computed = {username: dict(EMPTY_STATS) for username in usernames}
+        for row in rows:
+            computed[row.pop("_id")] = row
+        return computed
+
+    async def recompute(self, usernames):
+        """Recompute the given authors now; authors without published posts get zeros."""
+        computed = await self._aggregate(usernames)
+        computed_at = datetime.now(timezone.utc)
+        await self.collection.bulk_write(
+            [UpdateOne({"_id": username}, {"$set": {**stats, "computed_at": computed_at}}, upsert=True)
+             for username, stats in computed.items()],
+            ordered=False,
+        )
+        return computed
+
+    async def refresh_all(self):
+        """Recompute every author in batches; returns the number of authors written."""
+        started = datetime.now(timezone.utc)
+        written = 0
+        batch = []
+        async for row in self.db.blogs.aggregate(self._pipeline({}), allowDiskUse=True):
+            batch.append(UpdateOne({"_id": row.pop("_id")}, {"$set": {**row, "computed_at": started}}, upsert=True))
+            if len(batch) >= self.batch_size:
+                await self.collection.bulk_write(batch, ordered=False)
+                written += len(batch)
+                batch = []
+        if batch:
+            await self.collection.bulk_write(batch, ordered=False)
+            written += len(batch)
+        # Authors neither this pass nor a recompute since it started has written
+        # no longer have published posts
+        await self.collection.update_many(
+            {"computed_at": {"$not": {"$gte": started}}},
+            {"$set": {**EMPTY_STATS, "computed_at": started}},
+        )
+        return written
+
+
+async def _main(db, batch_size):
+    count = await AuthorStats(db, batch_size=batch_size).refresh_all()
+    logger.info(f"Recomputed stats for {count} authors")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute author profile aggregates")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    run_with_db(lambda db: _main(db, args.batch_size))
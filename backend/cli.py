@@ -0,0 +1,23 @@
+"""Shared entry point for the maintenance scripts run by hand (indexes.py, summaries.py, ...)."""
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+
+async def _with_db(job):
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        return await job(client[os.environ['DB_NAME']])
+    finally:
+        client.close()
+
+
+def run_with_db(job):
+    """Set up logging, connect with the app's .env settings and run job(db) to completion."""
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+    return asyncio.run(_with_db(job))
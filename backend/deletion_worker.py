@@ -0,0 +1,94 @@
+"""Background cascade delete for blogs.
+
+delete_blog records a tombstone in `blog_deletions` and removes the blog
+document straight away, so it disappears from every read. This worker then
+purges the blog's comments and likes in bounded, throttled batches and
+deletes the stored cover image. Tombstones are only removed once everything
+is gone, so an interrupted purge resumes on the next start.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+DEPENDENT_COLLECTIONS = ("comments", "likes")
+
+
+class DeletionWorker:
+    def __init__(self, db, storage, batch_size=500, pause=0.05, poll_interval=30.0):
+        self.db = db
+        self.storage = storage
+        self.batch_size = batch_size
+        self.pause = pause
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    async def enqueue(self, blog):
+        """Tombstone a blog and hide it; the purge happens in the background."""
+        await self.db.blog_deletions.update_one(
+            {"_id": blog["id"]},
+            {"$setOnInsert": {
+                "blog_id": blog["id"],
+                "cover_image_id": blog.get("cover_image_id"),
+                "requested_at": datetime.now(timezone.utc),
+            }},
+            upsert=True,
+        )
+        await self.db.blogs.delete_one({"id": blog["id"]})
+        self._wakeup.set()
+
+    async def _purge_collection(self, collection, blog_id):
+        removed = 0
+        while True:
+            batch = await collection.find({"blog_id": blog_id}, {"_id": 1}).limit(self.batch_size).to_list(self.batch_size)
+            if not batch:
+                return removed
+            result = await collection.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+            removed += result.deleted_count
+            await asyncio.sleep(self.pause)
+
+    async def purge(self, job):
+        blog_id = job["blog_id"]
+        # Covers an interruption between writing the tombstone and removing the blog
+        await self.db.blogs.delete_one({"id": blog_id})
+        counts = {}
+        for name in DEPENDENT_COLLECTIONS:
+            counts[name] = await self._purge_collection(self.db[name], blog_id)
+        if job.get("cover_image_id"):
+            await self.storage.delete(job["cover_image_id"])
+        await self.db.blog_deletions.delete_one({"_id": job["_id"]})
+        logger.info(f"Purged blog {blog_id}: {counts}")
+
+    async def run_once(self):
+        jobs = await self.db.blog_deletions.find().sort("requested_at", 1).to_list(None)
+        for job in jobs:
+            try:
+                await self.purge(job)
+            except Exception:
+                # Left in place and retried on the next pass
+                logger.exception(f"Failed to purge blog {job['blog_id']}")
+        return len(jobs)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            await self.run_once()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
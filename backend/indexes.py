@@ -0,0 +1,187 @@
+"""Index declarations for every collection server.py queries.
+
+Startup only ever creates missing indexes, and only one process at a time
+does so: it takes a short lease in the `leases` collection, and workers
+starting meanwhile skip the step. Indexes the app doesn't declare, such as
+ones an operator added, are left alone. An index's definition is never
+changed in place. To change one, declare it under a new name and list the
+old name in DEPRECATED. During a rolling deploy, old and new code then each
+find the index they need. Deprecated indexes are dropped by hand once no
+running version declares them:
+
+    python indexes.py --dry-run
+    python indexes.py
+    python indexes.py --drop-deprecated
+"""
+import argparse
+import logging
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from cli import run_with_db
+
+logger = logging.getLogger(__name__)
+
+# Every index the app relies on, keyed by collection
+INDEXES = {
+    "users": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+    ],
+    "user_sessions": [
+        IndexModel([("session_token", ASCENDING)], name="session_token_unique", unique=True),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "session_generations": [
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+    "blogs": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("is_published", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="published_feed_v2",
+        ),
+        IndexModel(
+            [("username", ASCENDING), ("is_published", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="author_feed_v2",
+        ),
+    ],
+    "comments": [
+        IndexModel(
+            [("blog_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="blog_comments_v2",
+        ),
+        # Recent comment activity for the trending score
+        IndexModel([("created_at", DESCENDING)], name="recent_comments"),
+    ],
+    "likes": [
+        IndexModel([("blog_id", ASCENDING), ("user_id", ASCENDING)], name="blog_user_unique", unique=True),
+    ],
+    "blog_deletions": [
+        # The deletion worker purges tombstones oldest first
+        IndexModel([("requested_at", ASCENDING)], name="requested_at"),
+    ],
+}
+
+# Indexes earlier versions declared, by collection; only these are ever dropped
+DEPRECATED = {
+    # Superseded by the _v2 indexes with the id tie-breaker for keyset pagination
+    "blogs": ["published_feed", "author_feed"],
+    "comments": ["blog_comments"],
+}
+
+# Index options that change behaviour; a same-named index that differs in them is a conflict
+_COMPARED_OPTIONS = ("unique", "expireAfterSeconds", "sparse", "partialFilterExpression")
+
+
+def _same_index(existing, declared):
+    if [tuple(k) for k in existing["key"]] != list(declared["key"].items()):
+        return False
+    return all(existing.get(opt) == declared.get(opt) for opt in _COMPARED_OPTIONS)
+
+
+async def ensure_indexes(db, dry_run=False, drop_deprecated=False):
+    """Create missing indexes; drop deprecated ones only when asked to.
+
+    Returns a report of the form {"created": [...], "unchanged": [...],
+    "failed": [...], "conflicting": [...], "deprecated": [...], "dropped": [...]}
+    with entries as "collection.index". "conflicting" are declared names that
+    exist with another definition; they are left as they are. With
+    dry_run=True the report is the plan and nothing is applied.
+    """
+    report = {"created": [], "unchanged": [], "failed": [], "conflicting": [], "deprecated": [], "dropped": []}
+
+    for collection_name in dict.fromkeys([*INDEXES, *DEPRECATED]):
+        collection = db[collection_name]
+        existing = await collection.index_information()
+
+        for model in INDEXES.get(collection_name, []):
+            name = model.document["name"]
+            if name in existing:
+                outcome = "unchanged" if _same_index(existing[name], model.document) else "conflicting"
+                report[outcome].append(f"{collection_name}.{name}")
+                continue
+            if not dry_run:
+                try:
+                    await collection.create_indexes([model])
+                except OperationFailure as e:
+                    # Typically duplicate data blocking a unique index; keep
+                    # starting up and let the operator clean the data.
+                    logger.error(f"Failed to create index {collection_name}.{name}: {e}")
+                    report["failed"].append(f"{collection_name}.{name}")
+                    continue
+            report["created"].append(f"{collection_name}.{name}")
+
+        for name in DEPRECATED.get(collection_name, []):
+            if name not in existing:
+                continue
+            if not drop_deprecated:
+                report["deprecated"].append(f"{collection_name}.{name}")
+                continue
+            if not dry_run:
+                await collection.drop_index(name)
+            report["dropped"].append(f"{collection_name}.{name}")
+
+    return report
+
+
+LEASE_NAME = "index_bootstrap"
+
+
+async def bootstrap_indexes(db, dry_run=False, lease_duration=timedelta(minutes=10)):
+    """ensure_indexes() from one process at a time; returns None when another holds the lease.
+
+    The lease expires on its own, so a process that dies mid-build doesn't
+    block later starts for longer than `lease_duration`.
+    """
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    now = datetime.now(timezone.utc)
+    try:
+        await db.leases.update_one(
+            {"_id": LEASE_NAME, "expires_at": {"$lt": now}},
+            {"$set": {"owner": owner, "expires_at": now + lease_duration}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # Held and not expired: the upsert's insert collides with it
+        return None
+    try:
+        return await ensure_indexes(db, dry_run=dry_run)
+    finally:
+        await db.leases.delete_one({"_id": LEASE_NAME, "owner": owner})
+
+
+def log_report(report, dry_run=False):
+    prefix = "[dry-run] would have " if dry_run else ""
+    for name in report["created"]:
+        logger.info(f"{prefix}created index {name}")
+    for name in report["dropped"]:
+        logger.info(f"{prefix}dropped index {name}")
+    for name in report["failed"]:
+        logger.warning(f"index {name} could not be created")
+    for name in report["conflicting"]:
+        logger.warning(f"index {name} exists with another definition; declare the new one under a new name")
+    for name in report["deprecated"]:
+        logger.info(f"deprecated index {name} is still present; drop it with --drop-deprecated after the rollout")
+    if not report["created"] and not report["dropped"]:
+        logger.info("Indexes up to date")
+
+
+async def _main(db, dry_run, drop_deprecated):
+    report = await ensure_indexes(db, dry_run=dry_run, drop_deprecated=drop_deprecated)
+    log_report(report, dry_run=dry_run)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile MongoDB indexes for NightBlog")
+    parser.add_argument("--dry-run", action="store_true", help="show the plan without applying it")
+    parser.add_argument("--drop-deprecated", action="store_true",
+                        help="also drop DEPRECATED indexes; only once no running version declares them")
+    args = parser.parse_args()
+
+    run_with_db(lambda db: _main(db, args.dry_run, args.drop_deprecated))
@@ -0,0 +1,178 @@
+"""Per-blog Server-Sent Events fan-out.
+
+LiveHub keeps, per process, the open subscriptions of each blog. A publish
+encodes the SSE frame once and appends the same bytes to every subscriber's
+bounded buffer. A subscriber whose buffer is full is dropped rather than
+slowing the publisher or growing without bound; its EventSource reconnects
+and BlogView refetches the comments and like count it may have missed. An
+idle subscription is one small object, a deque and an Event.
+
+With several workers, watch_changes() feeds the hub from Mongo change
+streams (replica set required) so every worker sees every write. In that
+setup handlers must not also publish locally.
+"""
+import asyncio
+import logging
+from collections import deque
+
+from responses import dumps
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriberLimitReached(Exception):
+    pass
+
+
+def encode_event(event, data):
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class Subscription:
+    __slots__ = ("blog_id", "max_queue", "dropped", "_frames", "_wakeup")
+
+    def __init__(self, blog_id, max_queue):
+        self.blog_id = blog_id
+        self.max_queue = max_queue
+        self.dropped = False
+        self._frames = deque()
+        self._wakeup = asyncio.Event()
+
+    def push(self, frame):
+        """Buffer a frame; returns False once the subscriber has been dropped."""
+        if self.dropped:
+            return False
+        if len(self._frames) >= self.max_queue:
+            self.dropped = True
+            self._wakeup.set()
+            return False
+        self._frames.append(frame)
+        self._wakeup.set()
+        return True
+
+    async def next_frames(self, timeout):
+        """Wait up to `timeout` for frames; returns them all, or [] on timeout."""
+        if not self._frames:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._wakeup.clear()
+        frames = list(self._frames)
+        self._frames.clear()
+        return frames
+
+
+class LiveHub:
+    def __init__(self, max_queue=32, max_subscribers=10000):
+        self.max_queue = max_queue
+        self.max_subscribers = max_subscribers
+        self._subscribers = {}
+        self.count = 0
+        self.dropped = 0
+
+    def full(self):
+        return self.count >= self.max_subscribers
+
+    def subscribe(self, blog_id):
+        if self.full():
+            raise SubscriberLimitReached()
+        subscription = Subscription(blog_id, self.max_queue)
+        self._subscribers.setdefault(blog_id, set()).add(subscription)
+        self.count += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscribers = self._subscribers.get(subscription.blog_id)
+        if subscribers and subscription in subscribers:
+            subscribers.discard(subscription)
+            self.count -= 1
+            if not subscribers:
+                del self._subscribers[subscription.blog_id]
+
+    def publish(self, blog_id, event, data):
+        subscribers = self._subscribers.get(blog_id)
+        if not subscribers:
+            return 0
+        frame = encode_event(event, data)
+        delivered = 0
+        for subscription in subscribers:
+            was_dropped = subscription.dropped
+            if subscription.push(frame):
+                delivered += 1
+            elif not was_dropped:
+                self.dropped += 1
+        return delivered
+
+    def stats(self):
+        return {"subscribers": self.count, "blogs": len(self._subscribers), "dropped": self.dropped}
+
+
+async def stream(hub, blog_id, heartbeat=15.0, max_lifetime=300.0, retry_ms=3000):
+    """SSE body subscribed to one blog.
+
+    The subscription is made once the body is first iterated, so a client that
+    disconnects before that never holds one. A comment line every `heartbeat`
+    idle seconds keeps proxies from closing the connection. Streams end after
+    `max_lifetime` so the client reconnects, which spreads connections over
+    workers and keeps graceful shutdowns bounded.
+    """
+    subscription = None
+    try:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_lifetime
+        # Checked up front by the handler; another request may have taken the last slot since
+        subscription = hub.subscribe(blog_id)
+        yield f"retry: {retry_ms}\n\n".encode()
+        while loop.time() < deadline:
+            frames = await subscription.next_frames(min(heartbeat, max(deadline - loop.time(), 0)))
+            if subscription.dropped:
+                return
+            yield b"".join(frames) if frames else b": ping\n\n"
+    except SubscriberLimitReached:
+        return
+    finally:
+        if subscription is not None:
+            hub.unsubscribe(subscription)
+
+
+async def _watch(hub, collection, pipeline, handle, **options):
+    resume_token = None
+    while True:
+        try:
+            async with collection.watch(pipeline, resume_after=resume_token, **options) as changes:
+                async for change in changes:
+                    resume_token = changes.resume_token
+                    handle(change)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception(f"Change stream on {collection.name} failed; retrying")
+            await asyncio.sleep(5)
+
+
+async def watch_changes(hub, db):
+    """Publish new comments and like counts from any worker."""
+    def on_comment(change):
+        comment = change["fullDocument"]
+        comment.pop("_id", None)
+        hub.publish(comment["blog_id"], "comment", comment)
+
+    def on_likes(change):
+        blog = change.get("fullDocument")
+        if blog:
+            hub.publish(blog["id"], "likes", {"likes": blog["likes"]})
+
+    await asyncio.gather(
+        _watch(hub, db.comments, [{"$match": {"operationType": "insert"}}], on_comment),
+        _watch(
+            hub,
+            db.blogs,
+            [
+                {"$match": {"operationType": "update", "updateDescription.updatedFields.likes": {"$exists": True}}},
+                {"$project": {"fullDocument.id": 1, "fullDocument.likes": 1}},
+            ],
+            on_likes,
+            full_document="updateLookup",
+        ),
+    )
@@ -0,0 +1,235 @@
+"""In-process request and Mongo command metrics in Prometheus text format.
+
+MetricsMiddleware records per-route counts, latency histograms, status codes
+and in-flight requests. CommandMetrics is a pymongo command listener that
+records per-collection, per-operation timings and returned/affected document
+counts. Both only update counters under a lock on the hot path; the text
+exposition is built when /api/metrics is scraped.
+
+Counters are per process; with several workers, scrape each one.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Commands that carry the collection name as their first value
+COLLECTION_COMMANDS = {
+    "find", "insert", "update", "delete", "aggregate", "count", "distinct",
+    "findAndModify", "createIndexes", "listIndexes", "dropIndexes",
+}
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = defaultdict(Histogram)
+        self.responses = defaultdict(int)
+        self.in_flight = 0
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, method, route, status, seconds):
+        with self._lock:
+            self.in_flight -= 1
+            self.latency[(method, route)].observe(seconds)
+            self.responses[(method, route, status)] += 1
+
+    def render(self):
+        with self._lock:
+            lines = [
+                "# HELP http_requests_in_flight Requests currently being handled.",
+                "# TYPE http_requests_in_flight gauge",
+                f"http_requests_in_flight {self.in_flight}",
+                "# HELP http_requests_total Completed requests by route and status code.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route, status), count in sorted(self.responses.items()):
+                lines.append(f"http_requests_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+            lines += [
+                "# HELP http_request_duration_seconds Request latency by route.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), histogram in sorted(self.latency.items()):
+                lines += histogram.render("http_request_duration_seconds", _labels(method=method, route=route))
+        return lines
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so timing adds no extra task or body buffering.
+
+    Requests are labelled with the route template (/api/blogs/{blog_id}), not
+    the raw path, to keep label cardinality bounded.
+    """
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.metrics.started()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            self.metrics.finished(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status,
+                time.perf_counter() - started,
+            )
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Times every command on the client it is registered with.
+
+    Pass it to AsyncIOMotorClient(event_listeners=[...]). Callbacks run on
+    pymongo's worker threads, hence the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self.latency = defaultdict(Histogram)
+        self.documents = defaultdict(int)
+        self.failures = defaultdict(int)
+
+    def started(self, event):
+        command = event.command
+        collection = command.get(event.command_name) if event.command_name in COLLECTION_COMMANDS else None
+        if event.command_name == "getMore":
+            collection = command.get("collection")
+        if not isinstance(collection, str):
+            collection = ""
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = collection
+
+    def _pop(self, event):
+        return self._pending.pop((event.connection_id, event.request_id), "")
+
+    def succeeded(self, event):
+        documents = _document_count(event.command_name, event.reply)
+        with self._lock:
+            key = (self._pop(event), event.command_name)
+            self.latency[key].observe(event.duration_micros / 1_000_000)
+            self.documents[key] += documents
+
+    def failed(self, event):
+        with self._lock:
+            key = (self._pop(event), event.command_name)
+            self.latency[key].observe(event.duration_micros / 1_000_000)
+            self.failures[key] += 1
+
+    def render(self):
+        with self._lock:
+            lines = [
+                "# HELP mongo_command_duration_seconds Mongo command latency by collection and operation.",
+                "# TYPE mongo_command_duration_seconds histogram",
+            ]
+            for (collection, operation), histogram in sorted(self.latency.items()):
+                lines += histogram.render(
+                    "mongo_command_duration_seconds", _labels(collection=collection, operation=operation)
+                )
+            lines += [
+                "# HELP mongo_command_documents_total Documents returned or written by commands.",
+                "# TYPE mongo_command_documents_total counter",
+            ]
+            for (collection, operation), count in sorted(self.documents.items()):
+                lines.append(
+                    f"mongo_command_documents_total{{{_labels(collection=collection, operation=operation)}}} {count}"
+                )
+            lines += [
+                "# HELP mongo_command_failures_total Commands that returned an error.",
+                "# TYPE mongo_command_failures_total counter",
+            ]
+            for (collection, operation), count in sorted(self.failures.items()):
+                lines.append(
+                    f"mongo_command_failures_total{{{_labels(collection=collection, operation=operation)}}} {count}"
+                )
+        return lines
+
+
+def _document_count(command_name, reply):
+    cursor = reply.get("cursor")
+    if cursor is not None:
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or ())
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") is not None else 0
+    count = reply.get("n")
+    return count if isinstance(count, int) else 0
+
+
+def render_stats(name, help_text, values, counters=()):
+    """Ad-hoc stats such as the session cache's, labelled by stat.
+
+    Keys in `counters` only ever grow and are exported as the counter
+    `<name>_total`, so rate() works on them and resets are detected; the
+    rest are gauges under `name`.
+    """
+    numbers = {
+        key: value for key, value in values.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+    lines = []
+    gauges = sorted(key for key in numbers if key not in counters)
+    if gauges:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        lines += [f'{name}{{{_labels(stat=key)}}} {numbers[key]}' for key in gauges]
+    totals = sorted(key for key in numbers if key in counters)
+    if totals:
+        lines += [f"# HELP {name}_total {help_text}", f"# TYPE {name}_total counter"]
+        lines += [f'{name}_total{{{_labels(stat=key)}}} {numbers[key]}' for key in totals]
+    return lines
@@ -0,0 +1,89 @@
+"""MongoDB client with pool settings from the environment and read routing.
+
+Motor connects lazily, so the client can be built at import time for the
+module-level `db`. The app runs warm_up() in a background startup task,
+retrying while Mongo is unreachable, so ready() stays False (and
+/api/ready answers 503) until the pool is warm; close() runs on shutdown. `read_db` is the handle public read endpoints use. It
+carries MONGO_PUBLIC_READ_PREFERENCE (e.g. secondaryPreferred). Writes always
+go to the primary whatever handle issues them.
+"""
+import asyncio
+import logging
+import os
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+
+logger = logging.getLogger(__name__)
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+# Client option -> environment variable; unset variables keep pymongo's default
+POOL_OPTIONS = {
+    "maxPoolSize": ("MONGO_MAX_POOL_SIZE", "100"),
+    "minPoolSize": ("MONGO_MIN_POOL_SIZE", "10"),
+    "maxIdleTimeMS": ("MONGO_MAX_IDLE_TIME_MS", None),
+    "waitQueueTimeoutMS": ("MONGO_WAIT_QUEUE_TIMEOUT_MS", None),
+    "connectTimeoutMS": ("MONGO_CONNECT_TIMEOUT_MS", "5000"),
+    "serverSelectionTimeoutMS": ("MONGO_SERVER_SELECTION_TIMEOUT_MS", "10000"),
+    "socketTimeoutMS": ("MONGO_SOCKET_TIMEOUT_MS", None),
+}
+
+
+def pool_options_from_env():
+    options = {}
+    for option, (variable, default) in POOL_OPTIONS.items():
+        value = os.environ.get(variable, default)
+        if value:
+            options[option] = int(value)
+    return options
+
+
+def read_preference(name, max_staleness=-1):
+    if name not in READ_PREFERENCES:
+        raise ValueError(f"Unknown read preference {name!r}; expected one of {', '.join(READ_PREFERENCES)}")
+    if name == "primary":
+        return Primary()
+    return READ_PREFERENCES[name](max_staleness=max_staleness)
+
+
+class Mongo:
+    def __init__(self, url, db_name, public_read_preference="primary", max_staleness=-1, **client_options):
+        self.client = AsyncIOMotorClient(url, **client_options)
+        self.db = self.client[db_name]
+        self.min_pool_size = client_options.get("minPoolSize", 0)
+        preference = read_preference(public_read_preference, max_staleness)
+        if isinstance(preference, Primary):
+            self.read_db = self.db
+        else:
+            self.read_db = self.client.get_database(db_name, read_preference=preference)
+        self.warm = False
+
+    async def warm_up(self):
+        """Select servers and open minPoolSize connections before taking traffic.
+
+        Concurrent pings force the pool to open that many sockets; with
+        secondary reads, the read pool is warmed the same way.
+        """
+        pings = max(1, self.min_pool_size)
+        await asyncio.gather(*(self.client.admin.command("ping") for _ in range(pings)))
+        if self.read_db is not self.db:
+            await asyncio.gather(*(
+                self.read_db.command("ping", read_preference=self.read_db.read_preference) for _ in range(pings)
+            ))
+        self.warm = True
+        logger.info(f"Mongo pool warmed with {pings} connections")
+
+    def ready(self):
+        """Warm and currently able to reach a primary, judged from the topology monitor without I/O."""
+        return self.warm and self.client.delegate.topology_description.has_writable_server()
+
+    def close(self):
+        self.warm = False
+        self.client.close()
@@ -0,0 +1,84 @@
+"""Opaque cursor (keyset) pagination on (created_at, id), newest first."""
+import base64
+import json
+import os
+from datetime import datetime, timezone
+
+PAGE_SIZE_MAX = int(os.environ.get('PAGE_SIZE_MAX', '100'))
+
+# Listings sort on created_at with id as tie-breaker; indexes.py declares
+# matching compound indexes so deep pages cost the same as the first.
+KEYSET_SORT = [("created_at", -1), ("id", -1)]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def clamp_limit(limit):
+    return max(1, min(limit, PAGE_SIZE_MAX))
+
+
+def _encode(payload):
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def encode_cursor(doc):
+    created_at = doc["created_at"]
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return _encode(["k", created_at.isoformat(), doc["id"]])
+
+
+def encode_offset_cursor(offset):
+    """Cursor for ranked listings (search) where keyset order doesn't apply."""
+    return _encode(["o", offset])
+
+
+def decode_offset_cursor(cursor):
+    payload = _decode(cursor)
+    if not (isinstance(payload, list) and len(payload) == 2 and payload[0] == "o"
+            and isinstance(payload[1], int) and payload[1] >= 0):
+        raise InvalidCursor("Invalid cursor")
+    return payload[1]
+
+
+def keyset_query(query, cursor):
+    """Restrict query to documents strictly after the cursor position."""
+    if not cursor:
+        return query
+    payload = _decode(cursor)
+    if not (isinstance(payload, list) and len(payload) == 3 and payload[0] == "k"):
+        raise InvalidCursor("Invalid cursor")
+    try:
+        created_at = datetime.fromisoformat(payload[1])
+    except (TypeError, ValueError):
+        raise InvalidCursor("Invalid cursor")
+    last_id = payload[2]
+    return {
+        **query,
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": last_id}},
+        ],
+    }
+
+
+async def fetch_page(collection, query, cursor=None, limit=20, projection=None):
+    """Return (docs, next_cursor); next_cursor is None on the last page."""
+    limit = clamp_limit(limit)
+    docs = await collection.find(keyset_query(query, cursor), projection or {"_id": 0}) \
+        .sort(KEYSET_SORT).limit(limit + 1).to_list(limit + 1)
+    if len(docs) > limit:
+        docs = docs[:limit]
+        return docs, encode_cursor(docs[-1])
+    return docs, None
@@ -0,0 +1,20 @@
+"""Background loops that repeat a coroutine on a fixed interval."""
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(coro_fn, interval, name):
+    """Await coro_fn() every `interval` seconds, first after one interval.
+
+    A failing run is logged and the loop carries on; run it as a task and
+    cancel it to stop.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            result = await coro_fn()
+            logger.debug(f"{name} done: {result}")
+        except Exception:
+            logger.exception(f"{name} failed")
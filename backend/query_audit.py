@@ -0,0 +1,311 @@
+"""Query-plan auditor for tests and staging (QUERY_AUDIT=true).
+
+QueryAuditor is a pymongo command listener. It reduces every find,
+aggregate, count, distinct, update, delete and findAndModify to a shape:
+the collection, the operation, the filter with values stripped and the sort
+keys. The first time a shape is seen, the command is explained once in the
+background with executionStats. The auditor records the winning plan's
+stages and the ratio of documents examined to documents returned.
+
+A shape is flagged when its plan has a COLLSCAN behind a non-empty filter or
+sorts in memory (a SORT stage, or a $sort stage left in an aggregation).
+Flags are logged as warnings. /api/debug/query-plans serves the report, and
+backend_test.py fails when anything is flagged. To check a running staging
+server from CI:
+
+    python query_audit.py --url https://staging.example.com
+
+Explains are extra reads against the primary, one per distinct shape, and
+every shape is kept in memory. Leave the auditor off in production.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import threading
+import urllib.request
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Command -> where its filter lives; "updates"/"deletes" are statement lists
+AUDITED_COMMANDS = {
+    "find": "filter",
+    "aggregate": "pipeline",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "update": "updates",
+    "delete": "deletes",
+}
+
+# Session, transaction and cluster fields the driver adds; not part of the query
+_DRIVER_FIELDS = {
+    "lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern",
+    "$db", "$clusterTime", "$readPreference", "apiVersion", "apiStrict", "apiDeprecationErrors",
+}
+
+_LIST_OPERATORS = {"$and", "$or", "$nor"}
+
+IGNORED_DATABASES = {"admin", "config", "local"}
+
+
+def strip_values(query):
+    """The filter's field names and operators, with every value replaced by "?"."""
+    if not isinstance(query, dict):
+        return "?"
+    shape = {}
+    for key, value in query.items():
+        if key in _LIST_OPERATORS and isinstance(value, list):
+            shape[key] = [strip_values(clause) for clause in value]
+        elif isinstance(value, dict) and any(str(k).startswith("$") for k in value):
+            shape[key] = strip_values(value)
+        else:
+            shape[key] = "?"
+    return shape
+
+
+def _sort_keys(sort):
+    return list(sort) if isinstance(sort, dict) else []
+
+
+def _pipeline_shape(pipeline):
+    shape = []
+    for stage in pipeline or []:
+        name = next(iter(stage), "?")
+        if name == "$match":
+            shape.append({name: strip_values(stage[name])})
+        elif name == "$sort":
+            shape.append({name: _sort_keys(stage[name])})
+        else:
+            shape.append(name)
+    return shape
+
+
+def command_shape(command_name, command):
+    """(filter shape, sort keys) of an audited command."""
+    if command_name == "aggregate":
+        return _pipeline_shape(command.get("pipeline")), []
+    field = AUDITED_COMMANDS[command_name]
+    if command_name in ("update", "delete"):
+        statements = command.get(field) or [{}]
+        return strip_values(statements[0].get("q", {})), []
+    return strip_values(command.get(field) or {}), _sort_keys(command.get("sort"))
+
+
+def has_filter(filter_shape):
+    """Whether a shape selects documents; an unfiltered read scans everything by design."""
+    if isinstance(filter_shape, list):
+        return any(isinstance(stage, dict) and stage.get("$match") for stage in filter_shape)
+    return bool(filter_shape)
+
+
+def explainable(command_name, command):
+    """The command minus driver fields; multi-statement writes keep their first statement."""
+    cleaned = {key: value for key, value in command.items() if key not in _DRIVER_FIELDS}
+    if command_name in ("update", "delete"):
+        field = AUDITED_COMMANDS[command_name]
+        cleaned[field] = list(cleaned.get(field) or [])[:1]
+    return cleaned
+
+
+def _find_key(document, key):
+    """First value stored under `key` anywhere in a nested explain document."""
+    if isinstance(document, dict):
+        if key in document:
+            return document[key]
+        values = document.values()
+    elif isinstance(document, list):
+        values = document
+    else:
+        return None
+    for value in values:
+        found = _find_key(value, key)
+        if found is not None:
+            return found
+    return None
+
+
+def _plan_stages(plan, stages):
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            stages.append(plan["stage"])
+        for value in plan.values():
+            _plan_stages(value, stages)
+    elif isinstance(plan, list):
+        for value in plan:
+            _plan_stages(value, stages)
+    return stages
+
+
+def analyze_explain(explain, filter_shape):
+    """Plan stages, docs examined and returned, and flags from an explain reply."""
+    planner = _find_key(explain, "queryPlanner") or {}
+    stages = _plan_stages(planner.get("winningPlan"), [])
+    # Aggregation stages that weren't pushed down into the query layer
+    for stage in explain.get("stages") or []:
+        if "$sort" in stage:
+            stages.append("$sort")
+    execution = _find_key(explain, "executionStats") or {}
+    examined = execution.get("totalDocsExamined", 0)
+    returned = execution.get("nReturned", 0)
+
+    flags = []
+    if "COLLSCAN" in stages and has_filter(filter_shape):
+        flags.append("COLLSCAN")
+    if "SORT" in stages or "$sort" in stages:
+        flags.append("SORT")
+    return {
+        "stages": stages,
+        "docs_examined": examined,
+        "docs_returned": returned,
+        "examined_per_returned": round(examined / returned, 2) if returned else float(examined),
+        "flags": flags,
+    }
+
+
+class QueryAuditor(monitoring.CommandListener):
+    """Explains each distinct query shape once and keeps the results.
+
+    Pass it to AsyncIOMotorClient(event_listeners=[...]) and call
+    start(client) from the running loop. Callbacks run on pymongo's worker
+    threads; explains are handed to the loop.
+    """
+
+    def __init__(self, max_shapes=1000):
+        self.max_shapes = max_shapes
+        self._lock = threading.Lock()
+        self._shapes = {}
+        self._client = None
+        self._loop = None
+        self._queue = None
+        self._task = None
+
+    def started(self, event):
+        if event.command_name not in AUDITED_COMMANDS or event.database_name in IGNORED_DATABASES:
+            return
+        command = event.command
+        collection = command.get(event.command_name)
+        if not isinstance(collection, str) or self._loop is None:
+            return
+        filter_shape, sort = command_shape(event.command_name, command)
+        key = json.dumps([event.database_name, collection, event.command_name, filter_shape, sort], sort_keys=True)
+        with self._lock:
+            entry = self._shapes.get(key)
+            if entry is not None:
+                entry["count"] += 1
+                return
+            if len(self._shapes) >= self.max_shapes:
+                return
+            entry = self._shapes[key] = {
+                "collection": collection,
+                "operation": event.command_name,
+                "filter": filter_shape,
+                "sort": sort,
+                "count": 1,
+                "plan": None,
+            }
+        explain = explainable(event.command_name, command)
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (event.database_name, explain, entry))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    async def _explain(self, database_name, command, entry):
+        try:
+            reply = await self._client[database_name].command(
+                {"explain": command, "verbosity": "executionStats"}
+            )
+        except Exception as e:
+            entry["plan"] = {"error": str(e), "flags": []}
+            logger.warning(f"Could not explain {entry['collection']}.{entry['operation']}: {e}")
+            return
+        entry["plan"] = analyze_explain(reply, entry["filter"])
+        if entry["plan"]["flags"]:
+            logger.warning(
+                f"Query plan {'+'.join(entry['plan']['flags'])} on {entry['collection']}.{entry['operation']} "
+                f"filter={json.dumps(entry['filter'])} sort={entry['sort']} "
+                f"stages={entry['plan']['stages']}"
+            )
+
+    async def _run(self):
+        while True:
+            database_name, command, entry = await self._queue.get()
+            try:
+                await self._explain(database_name, command, entry)
+            finally:
+                self._queue.task_done()
+
+    def start(self, client):
+        self._client = client
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        if self._task is None:
+            self._task = self._loop.create_task(self._run())
+
+    async def stop(self):
+        self._loop = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def settle(self, timeout=5.0):
+        """Wait for queued explains, so a report taken right after a test run is complete."""
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def report(self):
+        """Every shape seen, flagged shapes first, then by how often it ran."""
+        with self._lock:
+            shapes = [dict(entry) for entry in self._shapes.values()]
+        shapes.sort(key=lambda entry: (not (entry["plan"] or {}).get("flags"), -entry["count"]))
+        return {
+            "shapes": shapes,
+            "flagged": sum(1 for entry in shapes if (entry["plan"] or {}).get("flags")),
+            "pending": sum(1 for entry in shapes if entry["plan"] is None),
+        }
+
+
+def format_report(report):
+    lines = [f"{'flags':<16}{'count':>7}{'exam/ret':>10}  {'shape':<60}  stages"]
+    for entry in report["shapes"]:
+        plan = entry["plan"] or {}
+        ratio = plan.get("examined_per_returned")
+        shape = f"{entry['collection']}.{entry['operation']} {json.dumps(entry['filter'])}"
+        if entry["sort"]:
+            shape += f" sort {entry['sort']}"
+        lines.append(
+            f"{'+'.join(plan.get('flags', [])) or '-':<16}{entry['count']:>7}"
+            f"{'' if ratio is None else ratio:>10}  {shape:<60}  "
+            f"{plan.get('error') or ' > '.join(plan.get('stages', [])) or 'pending'}"
+        )
+    lines.append(f"{len(report['shapes'])} shapes, {report['flagged']} flagged, {report['pending']} pending")
+    return "\n".join(lines)
+
+
+def _main(url, as_json):
+    with urllib.request.urlopen(f"{url.rstrip('/')}/api/debug/query-plans") as response:
+        report = json.load(response)
+    print(json.dumps(report, indent=2) if as_json else format_report(report))
+    return 1 if report["flagged"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print a server's query-plan audit; exits 1 if any shape is flagged")
+    parser.add_argument("--url", default="http://localhost:8001", help="server running with QUERY_AUDIT=true")
+    parser.add_argument("--json", action="store_true", help="print the raw report")
+    args = parser.parse_args()
+
+    sys.exit(_main(args.url, args.json))
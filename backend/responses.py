@@ -0,0 +1,35 @@
+"""orjson-backed JSON responses.
+
+FastJSONResponse is the app's default response class. Hot read endpoints
+build it directly through json_response(), which skips FastAPI's
+jsonable_encoder pass over documents that came straight out of Mongo.
+"""
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# Mongo returns naive datetimes that are UTC; say so in the output
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content):
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def json_response(content, response=None, status_code=200):
+    """Render content with orjson, carrying over headers set on an injected Response."""
+    headers = None
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
@@ -0,0 +1,187 @@
+"""In-process full-text search over published blogs.
+
+A tokenized inverted index over title, content and author with BM25 ranking
+and prefix matching. It is rebuilt from Mongo on startup, kept current by the
+blog write endpoints, and optionally rebuilt periodically so workers that did
+not handle a write converge.
+"""
+import asyncio
+import bisect
+import math
+import re
+import heapq
+from collections import Counter, defaultdict
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Words that appear in nearly every post: they carry no ranking signal and
+# their posting lists would dominate query cost.
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i in is it its of on or "
+    "so that the this to was we were with you your".split()
+)
+
+# Field weights applied to term frequencies (content counts 1 per occurrence)
+FIELD_WEIGHTS = {"title": 3.0, "username": 2.0}
+
+# Prefix matches count for less than exact term matches
+PREFIX_WEIGHT = 0.5
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 20
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+INDEX_PROJECTION = {"_id": 0, "id": 1, "title": 1, "content": 1, "username": 1, "created_at": 1}
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+class SearchIndex:
+    def __init__(self):
+        self._postings = {}                 # term -> {doc_id: weighted tf}
+        self._doc_terms = {}                # doc_id -> terms, for removal
+        self._doc_length = {}               # doc_id -> weighted length
+        self._doc_created = {}              # doc_id -> created_at timestamp, tie-break
+        self._terms = []                    # sorted vocabulary for prefix lookups
+        self._total_length = 0.0
+        self._touched = None                # doc_id -> blog, or None if removed, during a rebuild
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def add(self, blog):
+        """Index (or re-index) a blog document."""
+        doc_id = blog["id"]
+        self.remove(doc_id)
+
+        # Content dominates the token count, so count it in C and fold the
+        # (short) weighted fields in afterwards.
+        frequencies = Counter(tokenize(blog.get("content")))
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(blog.get(field)):
+                frequencies[term] += weight
+
+        all_postings = self._postings
+        for term, tf in frequencies.items():
+            postings = all_postings.get(term)
+            if postings is None:
+                all_postings[term] = {doc_id: tf}
+                bisect.insort(self._terms, term)
+            else:
+                postings[doc_id] = tf
+
+        length = sum(frequencies.values())
+        self._doc_terms[doc_id] = tuple(frequencies)
+        self._doc_length[doc_id] = length
+        created_at = blog.get("created_at")
+        self._doc_created[doc_id] = created_at.timestamp() if created_at else 0.0
+        self._total_length += length
+        if self._touched is not None:
+            self._touched[doc_id] = blog
+
+    def remove(self, doc_id):
+        if self._touched is not None:
+            self._touched[doc_id] = None
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                index = bisect.bisect_left(self._terms, term)
+                if index < len(self._terms) and self._terms[index] == term:
+                    del self._terms[index]
+        self._total_length -= self._doc_length.pop(doc_id)
+        self._doc_created.pop(doc_id, None)
+
+    def _expand(self, token):
+        """Terms matching token: the exact term plus up to N prefix completions."""
+        matches = []
+        if token in self._postings:
+            matches.append((token, 1.0))
+        if len(token) < MIN_PREFIX_LENGTH:
+            return matches
+        start = bisect.bisect_left(self._terms, token)
+        for term in self._terms[start:start + MAX_PREFIX_EXPANSIONS + 1]:
+            if not term.startswith(token):
+                break
+            if term != token:
+                matches.append((term, PREFIX_WEIGHT))
+        return matches
+
+    def search(self, query, skip=0, limit=20):
+        """Return blog ids matching every query token, best first."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self._doc_terms:
+            return []
+
+        doc_count = len(self._doc_terms)
+        avg_length = self._total_length / doc_count
+        scores = None
+
+        doc_length = self._doc_length
+        length_factor = BM25_K1 * BM25_B / avg_length
+        base_norm = BM25_K1 * (1 - BM25_B)
+
+        for token in tokens:
+            token_scores = defaultdict(float)
+            for term, weight in self._expand(token):
+                postings = self._postings[term]
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                boost = weight * idf * (BM25_K1 + 1)
+                for doc_id, tf in postings.items():
+                    token_scores[doc_id] += boost * tf / (tf + base_norm + length_factor * doc_length[doc_id])
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc_id: score + token_scores[doc_id]
+                          for doc_id, score in scores.items() if doc_id in token_scores}
+            if not scores:
+                return []
+
+        created = self._doc_created
+        ranked = heapq.nlargest(skip + limit, scores, key=lambda d: (scores[d], created[d]))
+        return ranked[skip:]
+
+    async def rebuild(self, db, batch_size=1000):
+        """Replace the contents with every published blog, streamed from Mongo.
+
+        Writes applied to this index while the snapshot streams in may be
+        missing from it, so they are logged and replayed onto the fresh index
+        before it takes over.
+        """
+        fresh = SearchIndex()
+        self._touched = {}
+        try:
+            cursor = db.blogs.find({"is_published": True}, INDEX_PROJECTION, batch_size=batch_size)
+            count = 0
+            async for blog in cursor:
+                fresh.add(blog)
+                count += 1
+                if count % batch_size == 0:
+                    # Let requests run between batches when rebuilding a live index
+                    await asyncio.sleep(0)
+            for doc_id, blog in self._touched.items():
+                if blog is None:
+                    fresh.remove(doc_id)
+                else:
+                    fresh.add(blog)
+            self.__dict__.update(fresh.__dict__)
+        finally:
+            self._touched = None
+        return len(self)
+
+    def sync(self, blog):
+        """Apply a create/update: published blogs are indexed, drafts removed."""
+        if blog.get("is_published"):
+            self.add(blog)
+        else:
+            self.remove(blog["id"])
@@ -1,26 +1,77 @@
-from fastapi import FastAPI, APIRouter, HTTPException, status, Depends, UploadFile, File, Form, Cookie
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, status, Depends, UploadFile, File, Form, Cookie, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from contextlib import asynccontextmanager
 import os
+import asyncio
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
 from typing import List, Optional
 import uuid
+import re
 from datetime import datetime, timezone, timedelta
-import requests
 import cloudinary
-import cloudinary.uploader
+
+from auth_provider import AuthProviderClient, AuthProviderError
+from author_stats import AuthorStats
+from deletion_worker import DeletionWorker
+from indexes import bootstrap_indexes, log_report
+from like_reconciler import reconcile_counts
+from live import LiveHub, stream, watch_changes
+from metrics import CommandMetrics, MetricsMiddleware, RequestMetrics, render_stats
+from mongo import Mongo, pool_options_from_env
+from pagination import (
+    InvalidCursor, clamp_limit, decode_offset_cursor, encode_offset_cursor, fetch_page
+)
+from periodic import run_periodically
+from query_audit import QueryAuditor
+from responses import FastJSONResponse, json_response
+from search import SearchIndex
+from session_cache import SessionCache
+from signed_sessions import InvalidToken, SessionGenerations, SessionSigner, looks_signed
+from single_flight import SingleFlight
+from storage import LocalStorage, RequestSizeLimit, UploadTooLarge, create_storage, upload_file
+from summaries import SUMMARY_PROJECTION, summarize
+from trending import TrendingFeed
+from versions import VersionStore, blog_key, comments_key, etag_matches, feed_key, make_etag, user_key
+from view_counter import ViewCounter
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# Request and Mongo command metrics, served at /api/metrics
+request_metrics = RequestMetrics()
+command_metrics = CommandMetrics()
+
+# Opt-in query-plan audit for tests and staging: explains each distinct query
+# shape once and flags collection scans and in-memory sorts (/api/debug/query-plans)
+QUERY_AUDIT = os.environ.get('QUERY_AUDIT', 'false').lower() == 'true'
+query_auditor = QueryAuditor() if QUERY_AUDIT else None
+
+# MongoDB connection; pool sizes and timeouts come from MONGO_* variables.
+# Public reads without ETags use read_db (MONGO_PUBLIC_READ_PREFERENCE, e.g. secondaryPreferred).
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+mongo = Mongo(
+    mongo_url,
+    os.environ['DB_NAME'],
+    public_read_preference=os.environ.get('MONGO_PUBLIC_READ_PREFERENCE', 'primary'),
+    max_staleness=int(os.environ.get('MONGO_MAX_STALENESS_SECONDS', '-1')),
+    event_listeners=[command_metrics, query_auditor] if query_auditor else [command_metrics],
+    **pool_options_from_env(),
+)
+client = mongo.client
+db = mongo.db
+read_db = mongo.read_db
+# Endpoints that send ETags read their versions and content from the primary.
+# The two are separate reads, and with secondary reads they can land on
+# members lagging by different amounts, pairing a new ETag with stale content
+# that clients would then keep revalidating as current.
+etag_db = db
 
 # Cloudinary configuration
 cloudinary.config(
@@ -30,8 +81,201 @@ cloudinary.config(
     secure=True
 )
 
+# Image storage (STORAGE_BACKEND=cloudinary|local), uploads run on a bounded thread pool
+storage = create_storage()
+UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', str(10 * 1024 * 1024)))
+# Whole request bodies, checked before they are read; leaves room for the form fields next to a file
+REQUEST_MAX_BYTES = int(os.environ.get('REQUEST_MAX_BYTES', str(UPLOAD_MAX_BYTES + 1024 * 1024)))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# "apply" creates missing indexes on startup, "dry-run" only logs the plan, "off" skips it.
+# Startup never drops indexes; see indexes.py.
+INDEX_BOOTSTRAP = os.environ.get('INDEX_BOOTSTRAP', 'apply')
+
+# Set once the Mongo-dependent startup below has finished; /api/ready reports 503 until then
+startup_complete = asyncio.Event()
+STARTUP_RETRY_INTERVAL = 5.0
+
+async def start_up(tasks):
+    """Warm the pool, reconcile indexes and build in-memory state, then start background work.
+    
+    Runs as a task so the server answers /api/ready with 503 meanwhile. While
+    Mongo is unreachable the steps are retried rather than failing the process;
+    all of them are safe to repeat. Background tasks are appended to `tasks`.
+    """
+    while True:
+        try:
+            await mongo.warm_up()
+            if INDEX_BOOTSTRAP != "off":
+                dry_run = INDEX_BOOTSTRAP == "dry-run"
+                report = await bootstrap_indexes(db, dry_run=dry_run)
+                if report is None:
+                    logger.info("Another process is reconciling indexes; skipped")
+                else:
+                    log_report(report, dry_run=dry_run)
+            if session_signer:
+                await session_generations.start()
+            count = await search_index.rebuild(db)
+            logger.info(f"Search index built with {count} blogs")
+            count = await trending_feed.refresh(read_db)
+            logger.info(f"Trending feed built with {count} blogs")
+            break
+        except Exception:
+            logger.exception(f"Startup failed; retrying in {STARTUP_RETRY_INTERVAL:.0f}s")
+            await asyncio.sleep(STARTUP_RETRY_INTERVAL)
+    
+    if SEARCH_REFRESH_INTERVAL > 0:
+        tasks.append(asyncio.create_task(
+            run_periodically(lambda: search_index.rebuild(db), SEARCH_REFRESH_INTERVAL, "Search index refresh")
+        ))
+    if TRENDING_REFRESH_INTERVAL > 0:
+        tasks.append(asyncio.create_task(
+            run_periodically(lambda: trending_feed.refresh(read_db), TRENDING_REFRESH_INTERVAL, "Trending feed refresh")
+        ))
+    view_counter.start()
+    deletion_worker.start()
+    if AUTHOR_STATS_REFRESH_INTERVAL > 0:
+        tasks.append(asyncio.create_task(
+            run_periodically(author_stats.refresh_all, AUTHOR_STATS_REFRESH_INTERVAL, "Author stats refresh")
+        ))
+    if LIVE_CHANGE_STREAMS:
+        tasks.append(asyncio.create_task(watch_changes(live_hub, db)))
+    if LIKE_RECONCILE_INTERVAL > 0:
+        tasks.append(asyncio.create_task(
+            run_periodically(reconcile_counts_and_bump, LIKE_RECONCILE_INTERVAL, "Counter reconciliation")
+        ))
+    startup_complete.set()
+    logger.info("Startup complete")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if query_auditor:
+        query_auditor.start(client)
+    await auth_provider.start()
+    tasks = []
+    startup_task = asyncio.create_task(start_up(tasks))
+    yield
+    startup_task.cancel()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(startup_task, *tasks, return_exceptions=True)
+    startup_complete.clear()
+    await view_counter.stop()
+    await deletion_worker.stop()
+    await session_generations.stop()
+    await auth_provider.close()
+    if query_auditor:
+        await query_auditor.stop()
+    storage.shutdown()
+    mongo.close()
+
+# Resolved sessions, so authenticated requests skip the two Mongo lookups
+session_cache = SessionCache(
+    max_size=int(os.environ.get('SESSION_CACHE_SIZE', '10000')),
+    ttl=float(os.environ.get('SESSION_CACHE_TTL', '60')),
+)
+
+# SESSION_MODE=store keeps sessions in user_sessions; "signed" issues HMAC tokens
+# verified in-process (needs SESSION_SECRET). Signed tokens are accepted whenever
+# a secret is set, so switching back to store mode doesn't log anyone out.
+SESSION_MODE = os.environ.get('SESSION_MODE', 'store')
+SESSION_LIFETIME = timedelta(days=7)
+session_signer = None
+if os.environ.get('SESSION_SECRET'):
+    session_signer = SessionSigner(os.environ['SESSION_SECRET'], lifetime=SESSION_LIFETIME)
+elif SESSION_MODE == "signed":
+    raise RuntimeError("SESSION_MODE=signed requires SESSION_SECRET")
+session_generations = SessionGenerations(
+    db.session_generations,
+    poll_interval=float(os.environ.get('SESSION_REVOCATION_POLL_INTERVAL', '30')),
+    on_revoke=session_cache.invalidate_user,
+)
+
+# OAuth provider, shared keep-alive client for the session exchange
+auth_provider = AuthProviderClient(
+    os.environ.get('AUTH_PROVIDER_URL', 'https://demobackend.emergentagent.com'),
+    connect_timeout=float(os.environ.get('AUTH_PROVIDER_CONNECT_TIMEOUT', '3')),
+    read_timeout=float(os.environ.get('AUTH_PROVIDER_READ_TIMEOUT', '10')),
+    retries=int(os.environ.get('AUTH_PROVIDER_RETRIES', '2')),
+    max_connections=int(os.environ.get('AUTH_PROVIDER_MAX_CONNECTIONS', '100')),
+)
+
+# Full-text search over published blogs, rebuilt on startup and kept current by writes.
+# With several workers set SEARCH_REFRESH_INTERVAL so each picks up the others' writes.
+search_index = SearchIndex()
+SEARCH_REFRESH_INTERVAL = float(os.environ.get('SEARCH_REFRESH_INTERVAL', '0'))
+
+# Trending ranking of recent posts, recomputed in the background and served from memory
+trending_feed = TrendingFeed(
+    window_days=float(os.environ.get('TRENDING_WINDOW_DAYS', '7')),
+    half_life_hours=float(os.environ.get('TRENDING_HALF_LIFE_HOURS', '24')),
+    size=int(os.environ.get('TRENDING_SIZE', '500')),
+)
+TRENDING_REFRESH_INTERVAL = float(os.environ.get('TRENDING_REFRESH_INTERVAL', '60'))
+
+# Blog views are buffered in memory and flushed with one bulk_write
+view_counter = ViewCounter(
+    db.blogs,
+    flush_interval=float(os.environ.get('VIEW_FLUSH_INTERVAL', '5')),
+    max_buffer=int(os.environ.get('VIEW_FLUSH_MAX_BUFFER', '1000')),
+)
+
+# Cascade deletes of comments, likes and cover images run in the background
+deletion_worker = DeletionWorker(
+    db,
+    storage,
+    batch_size=int(os.environ.get('DELETE_BATCH_SIZE', '500')),
+    pause=float(os.environ.get('DELETE_BATCH_PAUSE', '0.05')),
+)
+
+# Identical concurrent hot reads share one query; SINGLE_FLIGHT_TTL adds a micro-cache.
+# Keyed by version key, so every write invalidates the reads it affects.
+single_flight = SingleFlight(
+    ttl=float(os.environ.get('SINGLE_FLIGHT_TTL', '0')),
+    enabled=os.environ.get('SINGLE_FLIGHT_ENABLED', 'true').lower() == 'true',
+)
+
+# Version counters behind ETags on public reads; bumped by every write that changes them.
+# Read from the primary, like the content behind them (see etag_db).
+version_store = VersionStore(etag_db.versions, on_bump=single_flight.invalidate)
+HTTP_CACHE_MAX_AGE = int(os.environ.get('HTTP_CACHE_MAX_AGE', '0'))
+
+# Post count, views, likes and last post per author for profile pages
+author_stats = AuthorStats(db)
+AUTHOR_STATS_REFRESH_INTERVAL = float(os.environ.get('AUTHOR_STATS_REFRESH_INTERVAL', '300'))
+
+# Live comment and like events per blog over SSE. With several workers set
+# LIVE_CHANGE_STREAMS=true (needs a replica set) so every worker sees every write.
+live_hub = LiveHub(
+    max_queue=int(os.environ.get('LIVE_QUEUE_SIZE', '32')),
+    max_subscribers=int(os.environ.get('LIVE_MAX_SUBSCRIBERS', '10000')),
+)
+LIVE_CHANGE_STREAMS = os.environ.get('LIVE_CHANGE_STREAMS', 'false').lower() == 'true'
+LIVE_HEARTBEAT = float(os.environ.get('LIVE_HEARTBEAT', '15'))
+LIVE_MAX_CONNECTION_SECONDS = float(os.environ.get('LIVE_MAX_CONNECTION_SECONDS', '300'))
+
+def publish_live(blog_id: str, event: str, data):
+    # The change stream watcher publishes instead when enabled, so events aren't doubled
+    if not LIVE_CHANGE_STREAMS:
+        live_hub.publish(blog_id, event, data)
+
+# Periodic repair of blogs.likes and blogs.comment_count drift (seconds, 0 disables)
+LIKE_RECONCILE_INTERVAL = float(os.environ.get('LIKE_RECONCILE_INTERVAL', '3600'))
+
+async def reconcile_counts_and_bump():
+    report = await reconcile_counts(db)
+    for entry in report["drifted"]:
+        await version_store.bump(feed_key(), blog_key(entry["id"]), user_key(entry["username"]))
+    logger.info(f"Counter reconciliation checked {report['checked']} blogs, repaired {len(report['drifted'])}")
+    return len(report["drifted"])
+
 # Create the main app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 api_router = APIRouter(prefix="/api")
 
 # Pydantic Models
@@ -59,13 +303,35 @@ class Blog(BaseModel):
     username: str
     title: str
     cover_image: Optional[str] = None
+    cover_image_id: Optional[str] = None
     content: str
+    excerpt: str = ""
+    word_count: int = 0
+    reading_time: int = 1
     is_published: bool = False
     likes: int = 0
+    comment_count: int = 0
     views: int = 0
+    revision: int = 0
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class BlogPatch(BaseModel):
+    """Fields to change; `revision` is the one the client last saw."""
+    model_config = ConfigDict(extra="forbid")
+    revision: int
+    title: Optional[str] = Field(None, min_length=1)
+    content: Optional[str] = Field(None, min_length=1)
+    is_published: Optional[bool] = None
+    
+    @field_validator("title", "content", "is_published", mode="before")
+    @classmethod
+    def not_null(cls, value):
+        # Fields may be left out, but a sent null would be written to the blog
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
 class Comment(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -83,6 +349,9 @@ class Like(BaseModel):
     user_id: str
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class LikedStatusRequest(BaseModel):
+    blog_ids: List[str] = Field(max_length=500)
+
 # Auth Helper
 async def get_current_user(session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
     token = session_token
@@ -93,110 +362,319 @@ async def get_current_user(session_token: Optional[str] = Cookie(None), authoriz
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
+    if session_signer and looks_signed(token):
+        return await get_signed_session_user(token)
+    
+    cached_user = session_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    
     session = await db.user_sessions.find_one({"session_token": token})
     if not session:
         raise HTTPException(status_code=401, detail="Invalid session")
     
-    if datetime.now(timezone.utc) > session["expires_at"].replace(tzinfo=timezone.utc):
-        await db.user_sessions.delete_one({"session_token": token})
+    # Expired rows are removed by the expires_at TTL index, not on the request path
+    expires_at = session["expires_at"].replace(tzinfo=timezone.utc)
+    if datetime.now(timezone.utc) > expires_at:
         raise HTTPException(status_code=401, detail="Session expired")
     
     user = await db.users.find_one({"id": session["user_id"]}, {"_id": 0})
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     
-    return User(**user)
+    # Trusted: straight from Mongo, so skip re-validation
+    user = User.model_construct(**user)
+    session_cache.set(token, user, expires_at)
+    return user
+
+# Image upload helper
+async def store_image(upload: UploadFile, folder: str, public_id: Optional[str] = None,
+                      transformation: Optional[list] = None) -> dict:
+    try:
+        fileobj = upload_file(upload, UPLOAD_MAX_BYTES)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    try:
+        return await storage.upload(fileobj, folder, public_id=public_id,
+                                    transformation=transformation, filename=upload.filename)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Image upload failed: {str(e)}")
+
+# Pagination helpers
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+async def paginate(response: Response, collection, query: dict, cursor: Optional[str], limit: int,
+                   projection: Optional[dict] = None, flight_tag: Optional[str] = None):
+    """Fetch one keyset page; list endpoints return the next cursor in a header.
+    
+    With flight_tag (the page's version key), identical concurrent fetches that
+    saw the same versions share one query.
+    """
+    def fetch():
+        return fetch_page(collection, query, cursor=cursor, limit=limit, projection=projection)
+    
+    try:
+        if flight_tag:
+            key = (flight_version(response), collection.name, repr(query), repr(projection), cursor, clamp_limit(limit))
+            docs, next_cursor = await single_flight.do(flight_tag, key, fetch)
+        else:
+            docs, next_cursor = await fetch()
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return docs, next_cursor
+
+# Conditional GET helper
+async def not_modified(request: Request, response: Response, keys: list) -> Optional[Response]:
+    """Set ETag/Cache-Control from the resource versions; return a 304 if the client is current."""
+    etag = make_etag(await version_store.get(keys), request.url.query)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+def flight_version(response: Response) -> Optional[str]:
+    """The ETag not_modified() set, for single-flight keys.
+    
+    Requests only share a flight or micro-cached result when they read the same
+    versions, so content cached before another worker's write is never served
+    under the ETag that write produced.
+    """
+    return response.headers.get("etag")
+
+async def require_blog(blog_id: str, source=None):
+    """404 unless the blog exists and isn't tombstoned for deletion."""
+    source = source if source is not None else db
+    blog, tombstone = await asyncio.gather(
+        source.blogs.find_one({"id": blog_id}, {"_id": 1}),
+        source.blog_deletions.find_one({"_id": blog_id}, {"_id": 1}),
+    )
+    if not blog or tombstone:
+        raise HTTPException(status_code=404, detail="Blog not found")
+
+# Username allocation
+USERNAME_ALLOCATION_ATTEMPTS = 5
+
+async def allocate_username(base_username: str) -> str:
+    """Pick base_username or base_username_<n> in one covered prefix query."""
+    pattern = f"^{re.escape(base_username)}(_[0-9]+)?$"
+    taken = await db.users.find({"username": {"$regex": pattern}}, {"_id": 0, "username": 1}).to_list(None)
+    if not taken:
+        return base_username
+    
+    highest = 0
+    for doc in taken:
+        suffix = doc["username"][len(base_username) + 1:]
+        if suffix.isdigit():
+            highest = max(highest, int(suffix))
+    return f"{base_username}_{highest + 1}"
+
+async def create_user(session_data: dict) -> User:
+    base_username = session_data["name"].lower().replace(" ", "_")
+    
+    # The unique indexes settle races: a concurrent signup taking the same
+    # username means we re-allocate, one for the same email means it won.
+    for _ in range(USERNAME_ALLOCATION_ATTEMPTS):
+        user = User(
+            email=session_data["email"],
+            name=session_data["name"],
+            username=await allocate_username(base_username),
+            picture=session_data.get("picture"),
+        )
+        try:
+            await db.users.insert_one(user.model_dump())
+            # A profile lookup for the name may have been micro-cached as not found
+            single_flight.invalidate(user_key(user.username))
+            return user
+        except DuplicateKeyError as e:
+            if "email" in (e.details or {}).get("keyPattern", {}):
+                existing_user = await db.users.find_one({"email": session_data["email"]}, {"_id": 0})
+                return User.model_construct(**existing_user)
+    
+    raise HTTPException(status_code=409, detail="Could not allocate a unique username")
+
+async def get_signed_session_user(token: str):
+    """Verify a signed token in-process; Mongo is only read on a session cache miss.
+    
+    Cached tokens were verified when cached, and a generation bump evicts the
+    user's entries, so a hit needs no further checks.
+    """
+    cached_user = session_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    
+    try:
+        claims = session_signer.verify(token)
+    except InvalidToken as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    if not await session_generations.accepts(claims.user_id, claims.generation):
+        raise HTTPException(status_code=401, detail="Session revoked")
+    
+    user = await db.users.find_one({"id": claims.user_id}, {"_id": 0})
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    # Re-checked so a logout that landed during the lookup isn't cached over
+    if claims.generation < session_generations.get(claims.user_id):
+        raise HTTPException(status_code=401, detail="Session revoked")
+    
+    user = User.model_construct(**user)
+    session_cache.set(token, user, claims.expires_at)
+    return user
+
+async def get_optional_user(session_token: Optional[str] = Cookie(None), authorization: Optional[str] = None):
+    try:
+        return await get_current_user(session_token, authorization)
+    except HTTPException:
+        return None
 
 # Root route
 @api_router.get("/")
 async def root():
     return {"message": "NightBlog API"}
 
+@api_router.get("/ready")
+async def readiness():
+    """503 until startup has finished (pool warm, indexes and in-memory state built), and whenever no primary is reachable."""
+    if not startup_complete.is_set() or not mongo.ready():
+        raise HTTPException(status_code=503, detail="Not ready")
+    return {"status": "ready"}
+
 # Auth Routes
 @api_router.post("/auth/session")
 async def create_session(session_id: str = Form(...)):
     try:
-        response = requests.get(
-            "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data",
-            headers={"X-Session-ID": session_id}
-        )
-        response.raise_for_status()
-        session_data = response.json()
+        session_data = await auth_provider.get_session_data(session_id)
         
         # Check if user exists
         existing_user = await db.users.find_one({"email": session_data["email"]}, {"_id": 0})
         
         if not existing_user:
-            # Generate unique username
-            base_username = session_data["name"].lower().replace(" ", "_")
-            username = base_username
-            counter = 1
-            while await db.users.find_one({"username": username}):
-                username = f"{base_username}_{counter}"
-                counter += 1
-            
-            user = User(
-                email=session_data["email"],
-                name=session_data["name"],
-                username=username,
-                picture=session_data.get("picture"),
-            )
-            await db.users.insert_one(user.model_dump())
+            user = await create_user(session_data)
         else:
-            user = User(**existing_user)
+            user = User.model_construct(**existing_user)
         
         # Create session
-        session_token = session_data["session_token"]
-        expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-        
-        await db.user_sessions.insert_one({
-            "user_id": user.id,
-            "session_token": session_token,
-            "expires_at": expires_at,
-            "created_at": datetime.now(timezone.utc)
-        })
+        if SESSION_MODE == "signed":
+            generation = await session_generations.current(user.id)
+            session_token, expires_at = session_signer.issue(user.id, generation)
+        else:
+            session_token = session_data["session_token"]
+            expires_at = datetime.now(timezone.utc) + SESSION_LIFETIME
+            
+            # Upsert so a repeated exchange of the same token doesn't trip the unique index
+            await db.user_sessions.update_one(
+                {"session_token": session_token},
+                {"$set": {
+                    "user_id": user.id,
+                    "session_token": session_token,
+                    "expires_at": expires_at,
+                    "created_at": datetime.now(timezone.utc)
+                }},
+                upsert=True
+            )
         
-        response = JSONResponse(content={"user": user.model_dump()})
+        response = FastJSONResponse(content={"user": user})
         response.set_cookie(
             key="session_token",
             value=session_token,
             httponly=True,
             secure=True,
             samesite="none",
-            max_age=7 * 24 * 60 * 60,
+            max_age=int(SESSION_LIFETIME.total_seconds()),
             path="/"
         )
         return response
         
+    except HTTPException:
+        raise
+    except AuthProviderError as e:
+        if e.status_code is not None and e.status_code < 500:
+            raise HTTPException(status_code=401, detail="Invalid session")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/auth/me")
 async def get_me(current_user: User = Depends(get_current_user)):
-    return current_user
+    return json_response(current_user)
+
+@api_router.get("/auth/cache-stats")
+async def get_session_cache_stats():
+    return session_cache.stats()
+
+@api_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    lines = request_metrics.render() + command_metrics.render()
+    lines += render_stats("session_cache", "Resolved-session cache lookups and size.", session_cache.stats(),
+                          counters=("hits", "misses"))
+    lines += render_stats("single_flight", "Coalesced and micro-cached hot reads.", single_flight.stats(),
+                          counters=("calls", "executed", "coalesced", "cache_hits", "invalidations"))
+    lines += render_stats("live_hub", "Live event subscribers and dropped slow consumers.", live_hub.stats(),
+                          counters=("dropped",))
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
+@api_router.get("/debug/query-plans")
+async def get_query_plans():
+    """Per-shape plans, flagged shapes first; 404 unless QUERY_AUDIT is on."""
+    if not query_auditor:
+        raise HTTPException(status_code=404, detail="Query audit is off")
+    await query_auditor.settle()
+    return query_auditor.report()
 
 @api_router.post("/auth/logout")
 async def logout(session_token: Optional[str] = Cookie(None)):
-    if session_token:
+    if session_token and session_signer and looks_signed(session_token):
+        # Signed tokens can't be deleted; bumping the generation revokes all of the user's sessions
+        try:
+            claims = session_signer.verify(session_token)
+        except InvalidToken:
+            claims = None
+        if claims:
+            await session_generations.bump(claims.user_id)
+    elif session_token:
+        session_cache.invalidate(session_token)
         await db.user_sessions.delete_one({"session_token": session_token})
     
-    response = JSONResponse(content={"message": "Logged out"})
+    response = FastJSONResponse(content={"message": "Logged out"})
     response.delete_cookie(key="session_token", path="/")
     return response
 
 # User Routes
 @api_router.get("/users/{username}")
-async def get_user_profile(username: str):
-    user = await db.users.find_one({"username": username}, {"_id": 0})
+async def get_user_profile(
+    request: Request,
+    response: Response,
+    username: str,
+    cursor: Optional[str] = None,
+    limit: int = 50
+):
+    cached = await not_modified(request, response, [user_key(username)])
+    if cached:
+        return cached
+    
+    tag = user_key(username)
+    version = flight_version(response)
+    user, stats, (blogs, next_cursor) = await asyncio.gather(
+        single_flight.do(tag, (version, "user"), lambda: etag_db.users.find_one({"username": username}, {"_id": 0})),
+        single_flight.do(tag, (version, "stats"), lambda: author_stats.get(username)),
+        paginate(response, etag_db.blogs, {"username": username, "is_published": True}, cursor, limit,
+                 projection=SUMMARY_PROJECTION, flight_tag=tag),
+    )
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    blogs = await db.blogs.find({"username": username, "is_published": True}, {"_id": 0}).to_list(100)
-    
-    return {
+    return json_response({
         "user": user,
-        "blogs": blogs
-    }
+        "stats": stats,
+        "blogs": blogs,
+        "next_cursor": next_cursor
+    }, response)
 
 @api_router.put("/users/profile")
 async def update_profile(
@@ -211,52 +689,185 @@ async def update_profile(
     }
     
     if profile_picture:
-        try:
-            file_content = await profile_picture.read()
-            result = cloudinary.uploader.upload(
-                file_content,
-                folder="nightblog/profiles",
-                public_id=f"profile_{current_user.id}",
-                transformation=[{"width": 400, "height": 400, "crop": "fill", "gravity": "face"}]
-            )
-            update_data["picture"] = result["secure_url"]
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Image upload failed: {str(e)}")
+        result = await store_image(
+            profile_picture,
+            folder="nightblog/profiles",
+            public_id=f"profile_{current_user.id}",
+            transformation=[{"width": 400, "height": 400, "crop": "fill", "gravity": "face"}]
+        )
+        update_data["picture"] = result["url"]
     
     await db.users.update_one({"id": current_user.id}, {"$set": update_data})
+    session_cache.invalidate_user(current_user.id)
+    await version_store.bump(user_key(current_user.username))
     
     updated_user = await db.users.find_one({"id": current_user.id}, {"_id": 0})
-    return User(**updated_user)
+    return json_response(User.model_construct(**updated_user))
 
 # Blog Routes
 @api_router.get("/blogs")
-async def get_blogs(search: Optional[str] = None, skip: int = 0, limit: int = 20):
-    query = {"is_published": True}
+async def get_blogs(
+    request: Request,
+    response: Response,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20
+):
+    cached = await not_modified(request, response, [feed_key()])
+    if cached:
+        return cached
+    
+    limit = clamp_limit(limit)
     if search:
-        query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"username": {"$regex": search, "$options": "i"}}
-        ]
+        # Search results are ranked, so their cursor is an offset into the ranking
+        if cursor:
+            try:
+                skip = decode_offset_cursor(cursor)
+            except InvalidCursor as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        ranked_ids = search_index.search(search, skip=skip, limit=limit + 1)
+        if len(ranked_ids) > limit:
+            ranked_ids = ranked_ids[:limit]
+            response.headers[NEXT_CURSOR_HEADER] = encode_offset_cursor(skip + limit)
+        if not ranked_ids:
+            return json_response([], response)
+        found = await etag_db.blogs.find({"id": {"$in": ranked_ids}, "is_published": True}, SUMMARY_PROJECTION).to_list(limit)
+        by_id = {blog["id"]: blog for blog in found}
+        return json_response([by_id[blog_id] for blog_id in ranked_ids if blog_id in by_id], response)
     
-    blogs = await db.blogs.find(query, {"_id": 0}).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
-    return blogs
+    if skip and not cursor:
+        # Legacy offset paging, kept for old clients; cursors don't degrade with depth
+        blogs = await etag_db.blogs.find({"is_published": True}, SUMMARY_PROJECTION).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+        return json_response(blogs, response)
+    
+    blogs, _ = await paginate(response, etag_db.blogs, {"is_published": True}, cursor, limit,
+                              projection=SUMMARY_PROJECTION, flight_tag=feed_key())
+    return json_response(blogs, response)
+
+@api_router.get("/blogs/trending")
+async def get_trending_blogs(response: Response, cursor: Optional[str] = None, limit: int = 20):
+    limit = clamp_limit(limit)
+    skip = 0
+    if cursor:
+        try:
+            skip = decode_offset_cursor(cursor)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    ranked_ids = trending_feed.page(skip=skip, limit=limit + 1)
+    if len(ranked_ids) > limit:
+        ranked_ids = ranked_ids[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_offset_cursor(skip + limit)
+    if not ranked_ids:
+        return json_response([], response)
+    found = await read_db.blogs.find({"id": {"$in": ranked_ids}, "is_published": True}, SUMMARY_PROJECTION).to_list(limit)
+    by_id = {blog["id"]: blog for blog in found}
+    return json_response([by_id[blog_id] for blog_id in ranked_ids if blog_id in by_id], response)
 
 @api_router.get("/blogs/{blog_id}")
-async def get_blog(blog_id: str):
-    blog = await db.blogs.find_one({"id": blog_id}, {"_id": 0})
+async def get_blog(request: Request, response: Response, blog_id: str, count_view: bool = True):
+    # Buffered increment; the editor passes count_view=false when loading a post.
+    # Views are not part of the version, so a revalidated copy may show an older count.
+    cached = await not_modified(request, response, [blog_key(blog_id)])
+    if cached:
+        if count_view:
+            view_counter.record(blog_id)
+        return cached
+    
+    blog = await single_flight.do(
+        blog_key(blog_id), flight_version(response),
+        lambda: etag_db.blogs.find_one({"id": blog_id}, {"_id": 0})
+    )
     if not blog:
         raise HTTPException(status_code=404, detail="Blog not found")
     
-    # Increment views
-    await db.blogs.update_one({"id": blog_id}, {"$inc": {"views": 1}})
-    blog["views"] += 1
+    if count_view:
+        view_counter.record(blog_id)
+    # The document may be shared with coalesced requests; copy rather than mutate
+    blog = {**blog, "views": blog["views"] + view_counter.pending(blog_id)}
     
-    return blog
+    return json_response(blog, response)
+
+@api_router.get("/blogs/{blog_id}/page")
+async def get_blog_page(
+    blog_id: str,
+    count_view: bool = True,
+    comments_limit: int = 50,
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    """Everything BlogView renders in one round trip, with the lookups run concurrently.
+    
+    The page is per viewer (liked) and embeds the author, so it carries no ETag,
+    but the shared parts are coalesced like GET /blogs/{id}: keyed by the blog
+    and comment versions read first, so concurrent readers of a busy post share
+    one query and none joins a query started before a write it has seen. The
+    content itself comes from read_db and may lag like any secondary read.
+    """
+    versions = await version_store.get([blog_key(blog_id), comments_key(blog_id)])
+    version = make_etag(versions)
+    
+    async def fetch_blog_with_author():
+        # Only public author fields; email stays private
+        docs = await read_db.blogs.aggregate([
+            {"$match": {"id": blog_id}},
+            {"$limit": 1},
+            {"$lookup": {"from": "users", "localField": "user_id", "foreignField": "id", "as": "author"}},
+            {"$addFields": {"author": {"$arrayElemAt": ["$author", 0]}}},
+            {"$project": {"_id": 0, "author._id": 0, "author.email": 0}},
+        ]).to_list(1)
+        return docs[0] if docs else None
+    
+    async def fetch_liked():
+        if not current_user:
+            return False
+        like = await db.likes.find_one({"blog_id": blog_id, "user_id": current_user.id}, {"_id": 1})
+        return like is not None
+    
+    def fetch_comments():
+        return fetch_page(read_db.comments, {"blog_id": blog_id}, limit=comments_limit)
+    
+    blog, (comments, next_cursor), liked = await asyncio.gather(
+        single_flight.do(blog_key(blog_id), (version, "page"), fetch_blog_with_author),
+        single_flight.do(comments_key(blog_id), (version, "page", clamp_limit(comments_limit)), fetch_comments),
+        fetch_liked(),
+    )
+    if not blog:
+        raise HTTPException(status_code=404, detail="Blog not found")
+    
+    if count_view:
+        view_counter.record(blog_id)
+    # Shared with coalesced requests; copy rather than mutate
+    blog = {**blog, "views": blog["views"] + view_counter.pending(blog_id)}
+    author = blog.pop("author", None)
+    
+    return json_response({
+        "blog": blog,
+        "author": author,
+        "comments": comments,
+        "comments_next_cursor": next_cursor,
+        "comment_count": blog.get("comment_count", 0),
+        "liked": liked
+    })
 
 @api_router.get("/blogs/{blog_id}/comments")
-async def get_comments(blog_id: str):
-    comments = await db.comments.find({"blog_id": blog_id}, {"_id": 0}).sort("created_at", -1).to_list(100)
-    return comments
+async def get_comments(
+    request: Request,
+    response: Response,
+    blog_id: str,
+    cursor: Optional[str] = None,
+    limit: int = 50
+):
+    cached = await not_modified(request, response, [comments_key(blog_id)])
+    if cached:
+        return cached
+    
+    # Comments outlive their blog until the deletion worker purges them
+    _, (comments, _) = await asyncio.gather(
+        require_blog(blog_id, etag_db),
+        paginate(response, etag_db.comments, {"blog_id": blog_id}, cursor, limit,
+                 flight_tag=comments_key(blog_id)),
+    )
+    return json_response(comments, response)
 
 @api_router.post("/blogs")
 async def create_blog(
@@ -267,28 +878,32 @@ async def create_blog(
     current_user: User = Depends(get_current_user)
 ):
     cover_url = None
+    cover_id = None
     if cover_image:
-        try:
-            file_content = await cover_image.read()
-            result = cloudinary.uploader.upload(
-                file_content,
-                folder="nightblog/covers",
-                transformation=[{"width": 1200, "height": 630, "crop": "fill"}]
-            )
-            cover_url = result["secure_url"]
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Image upload failed: {str(e)}")
+        result = await store_image(
+            cover_image,
+            folder="nightblog/covers",
+            transformation=[{"width": 1200, "height": 630, "crop": "fill"}]
+        )
+        cover_url = result["url"]
+        cover_id = result["public_id"]
     
     blog = Blog(
         user_id=current_user.id,
         username=current_user.username,
         title=title,
         content=content,
+        **summarize(content),
         cover_image=cover_url,
+        cover_image_id=cover_id,
         is_published=is_published
     )
     
     await db.blogs.insert_one(blog.model_dump())
+    search_index.sync(blog.model_dump())
+    if blog.is_published:
+        await author_stats.recompute([blog.username])
+    await version_store.bump(feed_key(), user_key(blog.username))
     return blog
 
 @api_router.put("/blogs/{blog_id}")
@@ -310,26 +925,73 @@ async def update_blog(
     update_data = {
         "title": title,
         "content": content,
+        **summarize(content),
         "is_published": is_published,
         "updated_at": datetime.now(timezone.utc)
     }
     
     if cover_image:
-        try:
-            file_content = await cover_image.read()
-            result = cloudinary.uploader.upload(
-                file_content,
-                folder="nightblog/covers",
-                transformation=[{"width": 1200, "height": 630, "crop": "fill"}]
-            )
-            update_data["cover_image"] = result["secure_url"]
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Image upload failed: {str(e)}")
+        result = await store_image(
+            cover_image,
+            folder="nightblog/covers",
+            transformation=[{"width": 1200, "height": 630, "crop": "fill"}]
+        )
+        update_data["cover_image"] = result["url"]
+        update_data["cover_image_id"] = result["public_id"]
     
-    await db.blogs.update_one({"id": blog_id}, {"$set": update_data})
+    await db.blogs.update_one({"id": blog_id}, {"$set": update_data, "$inc": {"revision": 1}})
     
     updated_blog = await db.blogs.find_one({"id": blog_id}, {"_id": 0})
-    return Blog(**updated_blog)
+    search_index.sync(updated_blog)
+    if not updated_blog["is_published"]:
+        trending_feed.remove(blog_id)
+    if updated_blog["is_published"] != blog["is_published"]:
+        await author_stats.recompute([blog["username"]])
+    await version_store.bump(feed_key(), blog_key(blog_id), user_key(blog["username"]))
+    return json_response(Blog.model_construct(**updated_blog))
+
+@api_router.patch("/blogs/{blog_id}")
+async def patch_blog(blog_id: str, patch: BlogPatch, current_user: User = Depends(get_current_user)):
+    """Autosave: apply only the sent fields if the blog is still at `revision`.
+    
+    Ownership, revision check and update are one find_one_and_update; a stale
+    revision gets a 409 carrying the current one.
+    """
+    changes = patch.model_dump(exclude_unset=True, exclude={"revision"})
+    if "content" in changes:
+        changes.update(summarize(changes["content"]))
+    changes["updated_at"] = datetime.now(timezone.utc)
+    
+    # Blogs written before revisions existed have no field, which null matches
+    current_revision = patch.revision if patch.revision else {"$in": [0, None]}
+    before = await db.blogs.find_one_and_update(
+        {"id": blog_id, "user_id": current_user.id, "revision": current_revision},
+        {"$set": changes, "$inc": {"revision": 1}},
+        {"_id": 0},
+        return_document=ReturnDocument.BEFORE
+    )
+    if not before:
+        blog = await db.blogs.find_one({"id": blog_id}, {"_id": 0, "user_id": 1, "revision": 1})
+        if not blog:
+            raise HTTPException(status_code=404, detail="Blog not found")
+        if blog["user_id"] != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Blog was changed elsewhere", "revision": blog.get("revision", 0)}
+        )
+    
+    updated_blog = {**before, **changes, "revision": before.get("revision", 0) + 1}
+    search_index.sync(updated_blog)
+    if not updated_blog["is_published"]:
+        trending_feed.remove(blog_id)
+    keys = [blog_key(blog_id)]
+    if before["is_published"] or updated_blog["is_published"]:
+        keys += [feed_key(), user_key(before["username"])]
+    if updated_blog["is_published"] != before["is_published"]:
+        await author_stats.recompute([before["username"]])
+    await version_store.bump(*keys)
+    return json_response(Blog.model_construct(**updated_blog))
 
 @api_router.delete("/blogs/{blog_id}")
 async def delete_blog(blog_id: str, current_user: User = Depends(get_current_user)):
@@ -340,31 +1002,83 @@ async def delete_blog(blog_id: str, current_user: User = Depends(get_current_use
     if blog["user_id"] != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    await db.blogs.delete_one({"id": blog_id})
-    await db.comments.delete_many({"blog_id": blog_id})
-    await db.likes.delete_many({"blog_id": blog_id})
+    # Hidden immediately; comments, likes and the cover are purged in batches
+    await deletion_worker.enqueue(blog)
+    search_index.remove(blog_id)
+    trending_feed.remove(blog_id)
+    if blog["is_published"]:
+        await author_stats.recompute([blog["username"]])
+    await version_store.bump(feed_key(), blog_key(blog_id), comments_key(blog_id), user_key(blog["username"]))
     
     return {"message": "Blog deleted"}
 
 @api_router.post("/blogs/{blog_id}/like")
-async def toggle_like(blog_id: str, current_user: User = Depends(get_current_user)):
-    existing_like = await db.likes.find_one({"blog_id": blog_id, "user_id": current_user.id})
+async def toggle_like(
+    blog_id: str,
+    liked: Optional[bool] = Form(None),
+    current_user: User = Depends(get_current_user)
+):
+    # Without `liked` this toggles; with it the call sets that state and is
+    # safe to repeat. Liking is tried first, so the common path is the upsert
+    # plus the counter update; a toggle that inserted nothing then unlikes.
+    # The counter only moves by what the upsert/delete actually did, and the
+    # unique (blog_id, user_id) index stops duplicate rows.
+    like_key = {"blog_id": blog_id, "user_id": current_user.id}
+    delta = 0
     
-    if existing_like:
-        await db.likes.delete_one({"blog_id": blog_id, "user_id": current_user.id})
-        await db.blogs.update_one({"id": blog_id}, {"$inc": {"likes": -1}})
-        return {"liked": False}
-    else:
+    if liked is not False:
         like = Like(blog_id=blog_id, user_id=current_user.id)
-        await db.likes.insert_one(like.model_dump())
-        await db.blogs.update_one({"id": blog_id}, {"$inc": {"likes": 1}})
-        return {"liked": True}
+        result = await db.likes.update_one(like_key, {"$setOnInsert": like.model_dump()}, upsert=True)
+        if result.upserted_id is not None:
+            delta = 1
+    
+    if delta == 0 and liked is not True:
+        result = await db.likes.delete_one(like_key)
+        delta = -result.deleted_count
+        liked = False
+    else:
+        liked = True
+    
+    if not delta:
+        # Nothing changed, so nothing below has checked the blog
+        await require_blog(blog_id)
+        return {"liked": liked}
+    
+    blog = await db.blogs.find_one_and_update(
+        {"id": blog_id},
+        {"$inc": {"likes": delta}},
+        {"_id": 0, "username": 1, "likes": 1, "is_published": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if not blog:
+        # Missing or already hidden for deletion; don't leave an orphaned like
+        # behind. A delete that lands after the $inc purges the row itself.
+        if delta > 0:
+            await db.likes.delete_one(like_key)
+        raise HTTPException(status_code=404, detail="Blog not found")
+    
+    if blog["is_published"]:
+        await author_stats.add_likes(blog["username"], delta)
+    await version_store.bump(feed_key(), blog_key(blog_id), user_key(blog["username"]))
+    publish_live(blog_id, "likes", {"likes": blog["likes"]})
+    return {"liked": liked, "likes": blog["likes"]}
 
 @api_router.get("/blogs/{blog_id}/liked")
 async def check_liked(blog_id: str, current_user: User = Depends(get_current_user)):
     like = await db.likes.find_one({"blog_id": blog_id, "user_id": current_user.id})
     return {"liked": like is not None}
 
+@api_router.post("/blogs/liked")
+async def check_liked_batch(payload: LikedStatusRequest, current_user: User = Depends(get_current_user)):
+    """Liked state for a page of cards in one $in query instead of one request per blog."""
+    blog_ids = list(dict.fromkeys(payload.blog_ids))
+    likes = await db.likes.find(
+        {"user_id": current_user.id, "blog_id": {"$in": blog_ids}},
+        {"_id": 0, "blog_id": 1}
+    ).to_list(len(blog_ids))
+    liked_ids = {like["blog_id"] for like in likes}
+    return {"liked": {blog_id: blog_id in liked_ids for blog_id in blog_ids}}
+
 @api_router.post("/blogs/{blog_id}/comments")
 async def add_comment(
     blog_id: str,
@@ -380,35 +1094,63 @@ async def add_comment(
     )
     
     await db.comments.insert_one(comment.model_dump())
+    # Counted after the insert: a delete racing it either sees the comment and
+    # purges it, or has hidden the blog already and the comment is taken back.
+    # A blog whose delete was interrupted before hiding it is purged on restart.
+    result = await db.blogs.update_one({"id": blog_id}, {"$inc": {"comment_count": 1}})
+    if not result.matched_count:
+        await db.comments.delete_one({"id": comment.id})
+        raise HTTPException(status_code=404, detail="Blog not found")
+    await version_store.bump(comments_key(blog_id), blog_key(blog_id))
+    publish_live(blog_id, "comment", comment)
     return comment
 
+@api_router.get("/blogs/{blog_id}/events")
+async def blog_events(blog_id: str):
+    """SSE stream of `comment` and `likes` events for one blog."""
+    if not await read_db.blogs.find_one({"id": blog_id}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Blog not found")
+    if live_hub.full():
+        raise HTTPException(status_code=503, detail="Too many live connections")
+    return StreamingResponse(
+        stream(live_hub, blog_id, heartbeat=LIVE_HEARTBEAT, max_lifetime=LIVE_MAX_CONNECTION_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @api_router.get("/users/{username}/blogs")
-async def get_user_blogs(username: str, current_user: Optional[User] = None):
+async def get_user_blogs(
+    response: Response,
+    username: str,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    current_user: Optional[User] = None
+):
     query = {"username": username}
     
     # If not the profile owner, only show published blogs
     if not current_user or current_user.username != username:
         query["is_published"] = True
     
-    blogs = await db.blogs.find(query, {"_id": 0}).sort("created_at", -1).to_list(100)
+    blogs, _ = await paginate(response, db.blogs, query, cursor, limit, projection=SUMMARY_PROJECTION)
     return blogs
 
 app.include_router(api_router)
 
+if isinstance(storage, LocalStorage):
+    app.mount(storage.base_url, StaticFiles(directory=storage.root), name="uploads")
+
+# Inside CORS, so browsers can read the 413
+app.add_middleware(RequestSizeLimit, max_bytes=REQUEST_MAX_BYTES)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+# Added last so it wraps CORS and every route, including failing ones
+app.add_middleware(MetricsMiddleware, metrics=request_metrics)
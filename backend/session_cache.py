@@ -0,0 +1,62 @@
+"""Bounded in-process cache of resolved sessions for get_current_user."""
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+
+class SessionCache:
+    """LRU cache of session token -> (User, session expiry) with a TTL.
+
+    Entries live for at most `ttl` seconds so a logout or profile change made
+    by another worker process is picked up within that window; local changes
+    invalidate immediately.
+    """
+
+    def __init__(self, max_size=10000, ttl=60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, token):
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        user, expires_at, cached_until = entry
+        if time.monotonic() > cached_until or datetime.now(timezone.utc) > expires_at:
+            del self._entries[token]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return user
+
+    def set(self, token, user, expires_at):
+        if self.max_size <= 0:
+            return
+        self._entries[token] = (user, expires_at, time.monotonic() + self.ttl)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, token):
+        self._entries.pop(token, None)
+
+    def invalidate_user(self, user_id):
+        for token in [t for t, entry in self._entries.items() if entry[0].id == user_id]:
+            del self._entries[token]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
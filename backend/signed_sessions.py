@@ -0,0 +1,175 @@
+"""HMAC-signed session tokens that verify without a database read.
+
+A token is "v1.<payload>.<signature>". The payload is base64url JSON
+[user_id, generation, expires_at]. The signature is HMAC-SHA256 over
+"v1.<payload>" with SESSION_SECRET.
+
+Revocation is per user. Logging out bumps the user's generation in
+`session_generations`, which invalidates every token issued before it.
+Each process keeps the generations in memory and polls for changes every
+`poll_interval` seconds. A logout made on another worker therefore takes
+effect within one poll; on the worker that handled it, it takes effect
+immediately. A token carrying a newer generation than the local copy, issued
+by another worker after a logout, makes the process re-read the user's
+generation rather than reject it.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PREFIX = "v1."
+
+
+class InvalidToken(Exception):
+    pass
+
+
+class SessionClaims(NamedTuple):
+    user_id: str
+    generation: int
+    expires_at: datetime
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def looks_signed(token):
+    return token.startswith(TOKEN_PREFIX)
+
+
+class SessionSigner:
+    def __init__(self, secret, lifetime=timedelta(days=7)):
+        if not secret:
+            raise ValueError("SessionSigner needs a non-empty secret")
+        self._key = secret.encode() if isinstance(secret, str) else secret
+        self.lifetime = lifetime
+
+    def _sign(self, signed_part):
+        return _b64encode(hmac.new(self._key, signed_part.encode(), hashlib.sha256).digest())
+
+    def issue(self, user_id, generation):
+        """Return (token, expires_at) for a new session."""
+        expires_at = datetime.now(timezone.utc) + self.lifetime
+        payload = _b64encode(json.dumps([user_id, generation, int(expires_at.timestamp())]).encode())
+        signed_part = TOKEN_PREFIX + payload
+        return f"{signed_part}.{self._sign(signed_part)}", expires_at
+
+    def verify(self, token):
+        """Check signature and expiry; raises InvalidToken, returns SessionClaims."""
+        signed_part, _, signature = token.rpartition(".")
+        if not looks_signed(signed_part):
+            raise InvalidToken("Invalid session")
+        if not hmac.compare_digest(signature.encode(), self._sign(signed_part).encode()):
+            raise InvalidToken("Invalid session")
+        try:
+            user_id, generation, expires = json.loads(_b64decode(signed_part[len(TOKEN_PREFIX):]))
+        except ValueError:
+            raise InvalidToken("Invalid session")
+        if time.time() > expires:
+            raise InvalidToken("Session expired")
+        return SessionClaims(user_id, generation, datetime.fromtimestamp(expires, timezone.utc))
+
+
+class SessionGenerations:
+    """In-memory copy of per-user session generations, refreshed by polling."""
+
+    # Re-read changes this far behind the last poll to cover clock skew between workers
+    POLL_OVERLAP = timedelta(seconds=5)
+
+    def __init__(self, collection, poll_interval=30.0, on_revoke=None):
+        self.collection = collection
+        self.poll_interval = poll_interval
+        # Called with the user id whenever a newer generation is seen
+        self.on_revoke = on_revoke
+        self._generations = {}
+        self._polled_at = None
+        self._task = None
+
+    def get(self, user_id):
+        return self._generations.get(user_id, 0)
+
+    def _advance(self, user_id, generation):
+        if generation > self._generations.get(user_id, 0):
+            self._generations[user_id] = generation
+            if self.on_revoke:
+                self.on_revoke(user_id)
+            return True
+        return False
+
+    async def accepts(self, user_id, generation):
+        """Whether a token of this generation is still valid.
+
+        A newer generation than the local copy means another worker has
+        issued it after a logout this process hasn't polled yet; re-read it
+        instead of rejecting a fresh token.
+        """
+        known = self.get(user_id)
+        if generation > known:
+            known = await self.current(user_id)
+        return generation >= known
+
+    async def current(self, user_id):
+        """Authoritative generation for issuing a new token."""
+        doc = await self.collection.find_one({"_id": user_id})
+        generation = doc["generation"] if doc else 0
+        self._advance(user_id, generation)
+        return generation
+
+    async def bump(self, user_id):
+        doc = await self.collection.find_one_and_update(
+            {"_id": user_id},
+            {"$inc": {"generation": 1}, "$set": {"updated_at": datetime.now(timezone.utc)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        self._advance(user_id, doc["generation"])
+        return doc["generation"]
+
+    async def poll(self):
+        started = datetime.now(timezone.utc)
+        query = {}
+        if self._polled_at is not None:
+            query = {"updated_at": {"$gte": self._polled_at - self.POLL_OVERLAP}}
+        changed = 0
+        async for doc in self.collection.find(query, {"generation": 1}):
+            if self._advance(doc["_id"], doc["generation"]):
+                changed += 1
+        self._polled_at = started
+        return changed
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.poll()
+            except Exception:
+                logger.exception("Session generation poll failed")
+
+    async def start(self):
+        await self.poll()
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,104 @@
+"""Request coalescing for hot reads.
+
+Concurrent calls with the same key share one in-flight query and its
+result. With `ttl` > 0 the result is also reused for that many seconds
+(a micro-cache).
+
+Every key belongs to a resource tag: the version key its data hangs off,
+such as "blog:<id>". VersionStore.bump() invalidates those tags before the
+write returns. From then on, callers start a fresh query instead of joining
+a flight or cache entry from before the write. Invalidation is per process:
+another worker's write isn't seen here until a caller reads the new version,
+whether it coalesces or caches. Callers therefore put the versions they read
+into the key, so requests only share a flight or cached result when they saw
+the same versions, and a reader that saw the new version never joins an
+older query.
+
+Results are shared between callers and must be treated as read-only.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class SingleFlight:
+    def __init__(self, ttl=0.0, max_entries=10000, enabled=True):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._inflight = {}
+        self._cache = OrderedDict()
+        self._tags = {}
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+        self.invalidations = 0
+
+    async def do(self, tag, key, fn):
+        """Return fn()'s result, sharing it with concurrent callers of the same (tag, key)."""
+        if not self.enabled:
+            return await fn()
+
+        full_key = (tag, key)
+        self.calls += 1
+        cached = self._cache.get(full_key)
+        if cached is not None:
+            expires_at, value = cached
+            if time.monotonic() < expires_at:
+                self.cache_hits += 1
+                return value
+            del self._cache[full_key]
+            self._untag(full_key)
+
+        task = self._inflight.get(full_key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.executed += 1
+            # A task of its own, so one caller's cancellation doesn't fail the others
+            task = asyncio.ensure_future(fn())
+            self._inflight[full_key] = task
+            self._tags.setdefault(tag, set()).add(full_key)
+            task.add_done_callback(lambda done: self._finish(tag, full_key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, tag, full_key, task):
+        if self._inflight.get(full_key) is not task:
+            # Invalidated while running; its result predates a write
+            return
+        del self._inflight[full_key]
+        if self.ttl > 0 and not task.cancelled() and task.exception() is None:
+            self._cache[full_key] = (time.monotonic() + self.ttl, task.result())
+            self._cache.move_to_end(full_key)
+            while len(self._cache) > self.max_entries:
+                evicted, _ = self._cache.popitem(last=False)
+                self._untag(evicted)
+        else:
+            self._untag(full_key)
+
+    def _untag(self, full_key):
+        keys = self._tags.get(full_key[0])
+        if keys is not None:
+            keys.discard(full_key)
+            if not keys:
+                del self._tags[full_key[0]]
+
+    def invalidate(self, *tags):
+        """Forget in-flight queries and cached results for these resource tags."""
+        for tag in tags:
+            for full_key in self._tags.pop(tag, ()):
+                self._inflight.pop(full_key, None)
+                self._cache.pop(full_key, None)
+                self.invalidations += 1
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "cache_hits": self.cache_hits,
+            "invalidations": self.invalidations,
+            "inflight": len(self._inflight),
+            "cached": len(self._cache),
+        }
@@ -0,0 +1,160 @@
+"""Image storage backends and upload size limits.
+
+Starlette reads and spools the whole multipart body before a route runs, so
+a cap checked in the route can't protect bandwidth or disk. RequestSizeLimit
+rejects oversized bodies first, from Content-Length when it is sent and by
+counting bytes as they arrive otherwise. Routes then check the file's own
+size and hand Starlette's spooled file to the backend on a bounded thread
+pool, so blocking SDK calls never run on the event loop.
+"""
+import asyncio
+import os
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cloudinary
+import cloudinary.uploader
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes):
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+def upload_file(upload, max_bytes):
+    """The spooled file behind an UploadFile, rewound; UploadTooLarge past max_bytes."""
+    size = upload.size
+    if size is None:
+        upload.file.seek(0, os.SEEK_END)
+        size = upload.file.tell()
+    if size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+    upload.file.seek(0)
+    return upload.file
+
+
+class RequestSizeLimit:
+    """Pure ASGI middleware answering 413 to request bodies over max_bytes."""
+
+    def __init__(self, app, max_bytes):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds {self.max_bytes} bytes"
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_bytes:
+                await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised inside body parsing, which re-raises HTTPExceptions as they are
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class StorageBackend:
+    """Interface for image stores. Results are {"url": ..., "public_id": ...}."""
+
+    def __init__(self, executor):
+        self._executor = executor
+
+    async def upload(self, fileobj, folder, public_id=None, transformation=None, filename=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._upload, fileobj, folder, public_id, transformation, filename
+        )
+
+    async def delete(self, public_id):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._delete, public_id)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    def _upload(self, fileobj, folder, public_id, transformation, filename):
+        raise NotImplementedError
+
+    def _delete(self, public_id):
+        raise NotImplementedError
+
+
+class CloudinaryStorage(StorageBackend):
+    def _upload(self, fileobj, folder, public_id, transformation, filename):
+        options = {"folder": folder}
+        if public_id:
+            options["public_id"] = public_id
+            options["overwrite"] = True
+        if transformation:
+            options["transformation"] = transformation
+        result = cloudinary.uploader.upload(fileobj, **options)
+        return {"url": result["secure_url"], "public_id": result["public_id"]}
+
+    def _delete(self, public_id):
+        cloudinary.uploader.destroy(public_id)
+
+
+class LocalStorage(StorageBackend):
+    """Stores files under a directory; for tests and air-gapped runs.
+
+    Transformations are not applied, images are stored as uploaded.
+    """
+
+    def __init__(self, executor, root, base_url):
+        super().__init__(executor)
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.base_url = base_url.rstrip("/")
+
+    def _upload(self, fileobj, folder, public_id, transformation, filename):
+        suffix = Path(filename).suffix.lower() if filename else ""
+        name = f"{public_id or uuid.uuid4().hex}{suffix}"
+        relative = f"{folder}/{name}"
+        target = self.root / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, "wb") as out:
+            shutil.copyfileobj(fileobj, out, CHUNK_SIZE)
+        return {"url": f"{self.base_url}/{relative}", "public_id": relative}
+
+    def _delete(self, public_id):
+        target = (self.root / public_id).resolve()
+        if self.root.resolve() in target.parents:
+            target.unlink(missing_ok=True)
+
+
+def create_storage():
+    """Build the backend selected by STORAGE_BACKEND (cloudinary or local)."""
+    executor = ThreadPoolExecutor(
+        max_workers=int(os.environ.get('UPLOAD_WORKERS', '4')),
+        thread_name_prefix="upload",
+    )
+    backend = os.environ.get('STORAGE_BACKEND', 'cloudinary')
+    if backend == "local":
+        return LocalStorage(
+            executor,
+            root=os.environ.get('LOCAL_STORAGE_DIR', str(Path(__file__).parent / 'uploads')),
+            base_url=os.environ.get('LOCAL_STORAGE_URL', '/api/uploads'),
+        )
+    if backend == "cloudinary":
+        return CloudinaryStorage(executor)
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
@@ -0,0 +1,101 @@
+"""Blog summaries for list endpoints: plain-text excerpt, word count, reading time.
+
+Computed once when a blog is written and served through SUMMARY_PROJECTION so
+feeds never transfer full Markdown bodies. Backfill existing posts with:
+
+    python summaries.py
+"""
+import argparse
+import logging
+import math
+import re
+
+from pymongo import UpdateOne
+
+from cli import run_with_db
+
+logger = logging.getLogger(__name__)
+
+EXCERPT_LENGTH = 200
+WORDS_PER_MINUTE = 200
+
+# Fields a blog card needs; everything except the Markdown body
+SUMMARY_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "user_id": 1,
+    "username": 1,
+    "title": 1,
+    "cover_image": 1,
+    "is_published": 1,
+    "likes": 1,
+    "views": 1,
+    "excerpt": 1,
+    "word_count": 1,
+    "reading_time": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
+
+_CODE_BLOCK_RE = re.compile(r"```.*?```", re.DOTALL)
+_IMAGE_RE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+_LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_LINE_MARKER_RE = re.compile(r"^\s{0,3}(#{1,6}\s+|>\s?|[-*+]\s+|\d+\.\s+)", re.MULTILINE)
+_EMPHASIS_RE = re.compile(r"(\*\*|__|\*|_|~~|`)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def markdown_to_text(content):
+    text = _CODE_BLOCK_RE.sub(" ", content or "")
+    text = _IMAGE_RE.sub(r"\1", text)
+    text = _LINK_RE.sub(r"\1", text)
+    text = _HTML_TAG_RE.sub(" ", text)
+    text = _LINE_MARKER_RE.sub("", text)
+    text = _EMPHASIS_RE.sub("", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def summarize(content):
+    """Summary fields for a Markdown body, stored alongside it on the blog."""
+    text = markdown_to_text(content)
+    excerpt = text
+    if len(text) > EXCERPT_LENGTH:
+        excerpt = text[:EXCERPT_LENGTH].rsplit(" ", 1)[0] + "…"
+    word_count = len(text.split())
+    return {
+        "excerpt": excerpt,
+        "word_count": word_count,
+        "reading_time": max(1, math.ceil(word_count / WORDS_PER_MINUTE)),
+    }
+
+
+async def backfill(db, batch_size=500):
+    """Compute summaries for blogs written before they existed."""
+    cursor = db.blogs.find({"excerpt": {"$exists": False}}, {"_id": 0, "id": 1, "content": 1},
+                           batch_size=batch_size)
+    updated = 0
+    batch = []
+    async for blog in cursor:
+        batch.append(UpdateOne({"id": blog["id"]}, {"$set": summarize(blog.get("content"))}))
+        if len(batch) >= batch_size:
+            await db.blogs.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+    if batch:
+        await db.blogs.bulk_write(batch, ordered=False)
+        updated += len(batch)
+    return updated
+
+
+async def _main(db, batch_size):
+    updated = await backfill(db, batch_size=batch_size)
+    logger.info(f"Backfilled summaries for {updated} blogs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill blog summaries (excerpt, word count, reading time)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    run_with_db(lambda db: _main(db, args.batch_size))
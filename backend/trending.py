@@ -0,0 +1,65 @@
+"""Trending ranking of recent published blogs.
+
+score = (LIKE_WEIGHT * likes + VIEW_WEIGHT * views + COMMENT_WEIGHT * recent comments)
+        * 0.5 ** (age_hours / half_life_hours)
+
+Posts older than the window have decayed out of contention and are never
+read. Each refresh costs two range reads: recent blogs on the published_feed_v2
+index and recent comments on comments.created_at. The ranked ids are kept as
+an in-memory snapshot, so serving a page is one `$in` read on blogs.id.
+"""
+import heapq
+import math
+from datetime import datetime, timedelta, timezone
+
+
+class TrendingFeed:
+    def __init__(self, window_days=7, half_life_hours=24.0, size=500,
+                 like_weight=3.0, view_weight=0.1, comment_weight=5.0):
+        self.window = timedelta(days=window_days)
+        self.decay = math.log(2) / half_life_hours
+        self.size = size
+        self.like_weight = like_weight
+        self.view_weight = view_weight
+        self.comment_weight = comment_weight
+        self._ranking = []
+        self.refreshed_at = None
+
+    def score(self, likes, views, comments, age_hours):
+        engagement = self.like_weight * likes + self.view_weight * views + self.comment_weight * comments
+        return engagement * math.exp(-self.decay * max(age_hours, 0.0))
+
+    async def refresh(self, db, now=None):
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - self.window
+        blogs = await db.blogs.find(
+            {"is_published": True, "created_at": {"$gte": cutoff}},
+            {"_id": 0, "id": 1, "likes": 1, "views": 1, "created_at": 1},
+        ).to_list(None)
+        counts = await db.comments.aggregate([
+            {"$match": {"created_at": {"$gte": cutoff}}},
+            {"$group": {"_id": "$blog_id", "count": {"$sum": 1}}},
+        ]).to_list(None)
+        comments = {row["_id"]: row["count"] for row in counts}
+
+        scored = []
+        for blog in blogs:
+            created_at = blog["created_at"]
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            age_hours = (now - created_at).total_seconds() / 3600
+            score = self.score(blog.get("likes", 0), blog.get("views", 0), comments.get(blog["id"], 0), age_hours)
+            if score > 0:
+                scored.append((score, blog["id"]))
+
+        self._ranking = [blog_id for _, blog_id in heapq.nlargest(self.size, scored)]
+        self.refreshed_at = now
+        return len(self._ranking)
+
+    def page(self, skip=0, limit=20):
+        return self._ranking[skip:skip + limit]
+
+    def remove(self, blog_id):
+        """Drop a deleted or unpublished blog until the next refresh."""
+        if blog_id in self._ranking:
+            self._ranking = [ranked for ranked in self._ranking if ranked != blog_id]
@@ -0,0 +1,64 @@
+"""Version counters behind the ETags of public read endpoints.
+
+Each cacheable resource has a key ("feed", "blog:<id>", "comments:<id>",
+"user:<username>") whose counter in the `versions` collection is bumped by
+every write that changes what the resource returns. Reads check one small
+document per key instead of recomputing the response.
+"""
+import hashlib
+
+from pymongo import UpdateOne
+
+
+def feed_key():
+    return "feed"
+
+
+def blog_key(blog_id):
+    return f"blog:{blog_id}"
+
+
+def comments_key(blog_id):
+    return f"comments:{blog_id}"
+
+
+def user_key(username):
+    return f"user:{username}"
+
+
+class VersionStore:
+    def __init__(self, collection, on_bump=None):
+        self.collection = collection
+        # Called with the keys before they are bumped, e.g. to drop cached reads
+        self.on_bump = on_bump
+
+    async def get(self, keys):
+        docs = await self.collection.find({"_id": {"$in": list(keys)}}).to_list(len(keys))
+        found = {doc["_id"]: doc["v"] for doc in docs}
+        return {key: found.get(key, 0) for key in keys}
+
+    async def bump(self, *keys):
+        if self.on_bump:
+            self.on_bump(*keys)
+        await self.collection.bulk_write(
+            [UpdateOne({"_id": key}, {"$inc": {"v": 1}}, upsert=True) for key in keys],
+            ordered=False,
+        )
+
+
+def make_etag(versions, variant=""):
+    """Strong ETag over the resource versions and the request variant (query string)."""
+    digest = hashlib.sha1()
+    for key in sorted(versions):
+        digest.update(f"{key}={versions[key]};".encode())
+    digest.update(variant.encode())
+    return f'"{digest.hexdigest()[:20]}"'
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
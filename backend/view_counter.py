@@ -0,0 +1,78 @@
+"""Write-behind buffer for blog view counts.
+
+Views are counted in memory per blog id and applied with one unordered
+bulk_write per flush instead of an update per page view.
+"""
+import asyncio
+import logging
+from collections import Counter
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    def __init__(self, collection, flush_interval=5.0, max_buffer=1000):
+        self.collection = collection
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._pending = Counter()
+        self._task = None
+        # Early flush for a full buffer; the reference keeps the task alive until it finishes
+        self._flush_task = None
+        self._flush_lock = asyncio.Lock()
+
+    def record(self, blog_id):
+        self._pending[blog_id] += 1
+        if len(self._pending) >= self.max_buffer and not self._flush_lock.locked() \
+                and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+            self._flush_task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Early view count flush failed", exc_info=task.exception())
+
+    def pending(self, blog_id):
+        """Views recorded but not yet written, for read-your-own-view counts."""
+        return self._pending.get(blog_id, 0)
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, Counter()
+            try:
+                await self.collection.bulk_write(
+                    [UpdateOne({"id": blog_id}, {"$inc": {"views": count}}) for blog_id, count in batch.items()],
+                    ordered=False,
+                )
+            except Exception:
+                # Put the counts back so the next flush retries them
+                self._pending.update(batch)
+                logger.exception("Failed to flush view counts")
+                return 0
+            return len(batch)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self.flush()
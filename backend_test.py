@@ -5,6 +5,7 @@ import sys
 import json
 from datetime import datetime
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 class NightBlogAPITester:
     def __init__(self, base_url="https://midnight-post.preview.emergentagent.com"):
@@ -240,6 +241,71 @@ class NightBlogAPITester:
         self.log_test("Update Blog", success, details)
         return success
 
+    def test_patch_blog(self):
+        """Test autosave PATCH: applies at the current revision, 409 on a stale one, rejects nulls"""
+        if not self.blog_id:
+            self.log_test("Patch Blog", False, "No blog ID available")
+            return False
+        
+        url = f"{self.api_url}/blogs/{self.blog_id}"
+        headers = {'Authorization': f'Bearer {self.session_token}'}
+        current = requests.get(url, params={'count_view': 'false'})
+        if current.status_code != 200:
+            self.log_test("Patch Blog", False, f"Get status: {current.status_code}")
+            return False
+        revision = current.json().get('revision', 0)
+        
+        title = f'Autosaved Test Blog {datetime.now().strftime("%H%M%S")}'
+        saved = requests.patch(url, headers=headers, json={'revision': revision, 'title': title})
+        stale = requests.patch(url, headers=headers, json={'revision': revision, 'title': 'Stale'})
+        null = requests.patch(url, headers=headers, json={'revision': revision + 1, 'title': None, 'is_published': None})
+        
+        success = (
+            saved.status_code == 200
+            and saved.json().get('title') == title
+            and saved.json().get('revision') == revision + 1
+            and stale.status_code == 409
+            and stale.json().get('detail', {}).get('revision') == revision + 1
+            and null.status_code == 422
+        )
+        details = f"Statuses: saved {saved.status_code}, stale {stale.status_code}, null {null.status_code}"
+        self.log_test("Patch Blog", success, details)
+        return success
+
+    def test_read_after_write(self):
+        """Test that coalesced/micro-cached reads never return a blog from before an update"""
+        if not self.blog_id:
+            self.log_test("Read After Write", False, "No blog ID available")
+            return False
+        
+        url = f"{self.api_url}/blogs/{self.blog_id}"
+        cookies = {'session_token': self.session_token}
+        stale = []
+        
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            for i in range(5):
+                title = f'Read After Write {i} {datetime.now().strftime("%H%M%S%f")}'
+                # Keep identical reads in flight while the update lands
+                readers = [pool.submit(requests.get, url, params={'count_view': 'false'}) for _ in range(20)]
+                response = requests.put(url, cookies=cookies, data={
+                    'title': title,
+                    'content': '# Read after write\n\nChecking coalesced reads.',
+                    'is_published': 'true'
+                })
+                if response.status_code != 200:
+                    self.log_test("Read After Write", False, f"Update status: {response.status_code}")
+                    return False
+                after = requests.get(url, params={'count_view': 'false'})
+                for reader in readers:
+                    reader.result()
+                if after.status_code != 200 or after.json().get('title') != title:
+                    stale.append(title)
+        
+        success = not stale
+        details = "All reads after an update saw it" if success else f"Stale reads after: {stale}"
+        self.log_test("Read After Write", success, details)
+        return success
+
     def test_like_blog(self):
         """Test blog like functionality"""
         if not self.blog_id:
@@ -394,6 +460,29 @@ class NightBlogAPITester:
         self.log_test("Delete Blog", success, details)
         return success
 
+    def test_query_plans(self):
+        """Test that no query shape scans a collection or sorts in memory (server run with QUERY_AUDIT=true)"""
+        response = self.make_request('GET', 'debug/query-plans')
+        if response is not None and response.status_code == 404:
+            print("⏭️  Query Plans - skipped, server not running with QUERY_AUDIT=true")
+            return True
+        success = response is not None and response.status_code == 200
+        
+        if success:
+            report = response.json()
+            flagged = [s for s in report['shapes'] if (s['plan'] or {}).get('flags')]
+            success = not flagged
+            details = f"{len(report['shapes'])} query shapes, none flagged" if success else "; ".join(
+                f"{s['collection']}.{s['operation']} {json.dumps(s['filter'])} sort={s['sort']}: "
+                f"{'+'.join(s['plan']['flags'])}"
+                for s in flagged
+            )
+        else:
+            details = f"Status: {response.status_code if response else 'No response'}"
+            
+        self.log_test("Query Plans", success, details)
+        return success
+
     def run_all_tests(self):
         """Run all API tests"""
         print("🚀 Starting NightBlog API Tests...")
@@ -419,6 +508,8 @@ class NightBlogAPITester:
         self.test_create_blog()
         self.test_get_blog()
         self.test_update_blog()
+        self.test_patch_blog()
+        self.test_read_after_write()
         
         # Interaction tests
         self.test_like_blog()
@@ -434,6 +525,9 @@ class NightBlogAPITester:
         self.test_delete_blog()
         self.test_logout()
         
+        # Plans of every query the run above issued
+        self.test_query_plans()
+        
         # Print results
         print("=" * 50)
         print(f"📊 Tests completed: {self.tests_passed}/{self.tests_run}")
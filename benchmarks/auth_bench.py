@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Auth overhead per request: store-backed sessions vs signed tokens.
+
+Calls server.get_current_user directly for a pool of seeded users in
+four setups:
+
+  store, no cache    user_sessions + users lookups on every call
+  store, cached      SessionCache hit
+  signed, no cache   HMAC verify + generation check + users lookup
+  signed, cached     SessionCache hit; tokens are verified once before caching
+
+    python benchmarks/auth_bench.py --mongo-url mongodb://localhost:27017
+    python benchmarks/auth_bench.py --memory   # mongomock-motor; Mongo costs are not representative
+
+For end-to-end numbers run load_test.py with --session-mode store|signed.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+
+def load_server(args, db_name):
+    if args.memory:
+        try:
+            import mongomock_motor
+        except ImportError:
+            sys.exit("--memory needs mongomock-motor: pip install mongomock-motor")
+        import motor.motor_asyncio
+        motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+    os.environ.update({
+        "MONGO_URL": args.mongo_url,
+        "DB_NAME": db_name,
+        "SESSION_SECRET": "auth-bench-secret",
+        "STORAGE_BACKEND": "local",
+    })
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.chdir(BACKEND_DIR)
+    import server
+    return server
+
+
+async def seed(server, count):
+    now = datetime.now(timezone.utc)
+    users = [{
+        "id": str(uuid.uuid4()),
+        "email": f"bench{i}@bench.local",
+        "name": f"Bench {i}",
+        "username": f"bench{i}",
+        "created_at": now,
+    } for i in range(count)]
+    await server.db.users.insert_many(users)
+    store_tokens = [f"store-{uuid.uuid4().hex}" for _ in users]
+    await server.db.user_sessions.insert_many([{
+        "user_id": user["id"],
+        "session_token": token,
+        "expires_at": now + timedelta(days=1),
+        "created_at": now,
+    } for user, token in zip(users, store_tokens)])
+    signed_tokens = [server.session_signer.issue(user["id"], 0)[0] for user in users]
+    return store_tokens, signed_tokens
+
+
+async def measure(server, tokens, iterations, cached):
+    server.session_cache = server.SessionCache(max_size=len(tokens) if cached else 0, ttl=3600)
+    for token in tokens:
+        await server.get_current_user(token, None)
+    timings = []
+    for i in range(iterations):
+        token = tokens[i % len(tokens)]
+        started = time.perf_counter()
+        await server.get_current_user(token, None)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    timings.sort()
+    return {
+        "mean_us": statistics.fmean(timings),
+        "p50_us": timings[len(timings) // 2],
+        "p99_us": timings[int(len(timings) * 0.99)],
+    }
+
+
+async def run(args):
+    db_name = f"nightblog_auth_bench_{uuid.uuid4().hex[:8]}"
+    server = load_server(args, db_name)
+    try:
+        store_tokens, signed_tokens = await seed(server, args.users)
+        print(f"{'setup':<20}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}")
+        for label, tokens, cached in (
+            ("store, no cache", store_tokens, False),
+            ("store, cached", store_tokens, True),
+            ("signed, no cache", signed_tokens, False),
+            ("signed, cached", signed_tokens, True),
+        ):
+            result = await measure(server, tokens, args.iterations, cached)
+            print(f"{label:<20}{result['mean_us']:>10.1f}{result['p50_us']:>10.1f}{result['p99_us']:>10.1f}")
+    finally:
+        await server.client.drop_database(db_name)
+        server.client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--memory", action="store_true", help="use mongomock-motor instead of a mongod")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""Reproducible load test for the NightBlog API.
+
+The functional checks live in backend_test.py; this drives the same
+endpoints for performance. It starts backend/server.py on a free port, with
+the OAuth provider replaced by a local stub and images stored on local
+disk instead of Cloudinary. It seeds users, blogs, comments and likes
+through the API, then runs a concurrent mixed workload (feed browsing, post
+reads, likes, comments, searches, logins). It reports p50/p95/p99 latency
+and throughput per route and writes the results as JSON for comparison
+between commits.
+
+    # against a running mongod (a throwaway database is created and dropped)
+    python benchmarks/load_test.py --mongo-url mongodb://localhost:27017
+
+    # start a private mongod from PATH, or use the in-memory stand-in
+    python benchmarks/load_test.py --start-mongod
+    python benchmarks/load_test.py --memory
+
+    # compare with an earlier run
+    python benchmarks/load_test.py --memory --compare bench_results/previous.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = ROOT_DIR / "backend"
+
+WORDS = (
+    "night code async mongo index cursor latency python react design cache stream token "
+    "deploy query vector render thread socket kernel garden coffee travel music winter "
+    "river mountain city story photo recipe"
+).split()
+
+# Relative weights of the mixed workload
+DEFAULT_MIX = {
+    "feed": 30,
+    "feed_next_page": 10,
+    "read_post": 30,
+    "comments": 8,
+    "search": 10,
+    "like": 6,
+    "comment": 4,
+    "login": 2,
+}
+
+
+# -- stub OAuth provider ------------------------------------------------------
+
+class _StubProviderHandler(BaseHTTPRequestHandler):
+    """Answers the session-data exchange with a user derived from the session id."""
+
+    def do_GET(self):
+        session_id = self.headers.get("X-Session-ID", "")
+        body = json.dumps({
+            "email": f"{session_id}@bench.local",
+            "name": f"Bench {session_id.split('-')[0]}",
+            "picture": None,
+            "session_token": f"token-{session_id}-{uuid.uuid4().hex}",
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_provider():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubProviderHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# -- process management -------------------------------------------------------
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mongod(workdir):
+    if not shutil.which("mongod"):
+        sys.exit("--start-mongod needs a mongod binary on PATH")
+    port = free_port()
+    dbpath = Path(workdir) / "mongod"
+    dbpath.mkdir()
+    process = subprocess.Popen(
+        ["mongod", "--dbpath", str(dbpath), "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return process, f"mongodb://127.0.0.1:{port}"
+
+
+def start_server(args, workdir, provider_url, mongo_url, db_name):
+    port = free_port()
+    env = {
+        **os.environ,
+        "DB_NAME": db_name,
+        "AUTH_PROVIDER_URL": provider_url,
+        "STORAGE_BACKEND": "local",
+        "LOCAL_STORAGE_DIR": str(Path(workdir) / "uploads"),
+        "LIKE_RECONCILE_INTERVAL": "0",
+        "SESSION_MODE": args.session_mode,
+        "SESSION_SECRET": "load-test-secret",
+    }
+    if args.memory:
+        env["MONGO_URL"] = "mongodb://memory"
+        command = [sys.executable, str(ROOT_DIR / "benchmarks" / "memory_server.py"), "--port", str(port)]
+    else:
+        env["MONGO_URL"] = mongo_url
+        command = [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port),
+                   "--workers", str(args.workers), "--log-level", "warning"]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def wait_until_up(process, base_url, path="/api/ready", timeout=60):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with status {process.returncode} before accepting requests")
+            try:
+                if (await client.get(f"{base_url}{path}")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} did not come up within {timeout}s")
+
+
+def stop(process):
+    if process and process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+# -- measurement --------------------------------------------------------------
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.enabled = True
+
+    async def request(self, client, route, method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            if self.enabled:
+                self.errors[route] += 1
+            return None
+        if self.enabled:
+            self.samples[route].append((time.perf_counter() - started) * 1000)
+            self.statuses[route][response.status_code] += 1
+            if response.status_code >= 500:
+                self.errors[route] += 1
+        return response
+
+    def report(self, elapsed):
+        routes = {}
+        for route in sorted(set(self.samples) | set(self.errors)):
+            samples = sorted(self.samples.get(route, []))
+            routes[route] = {
+                "count": len(samples),
+                "errors": self.errors.get(route, 0),
+                "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+                "p50_ms": percentile(samples, 50),
+                "p95_ms": percentile(samples, 95),
+                "p99_ms": percentile(samples, 99),
+                "max_ms": samples[-1] if samples else None,
+                "statuses": dict(self.statuses.get(route, {})),
+            }
+        return routes
+
+
+def percentile(ordered, pct):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+# -- seeding ------------------------------------------------------------------
+
+def sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+async def login(client, recorder):
+    response = await recorder.request(client, "POST /api/auth/session", "POST", "/api/auth/session",
+                                      data={"session_id": f"user{uuid.uuid4().hex[:8]}-{uuid.uuid4().hex}"})
+    response.raise_for_status()
+    # Keep the shared client's cookie jar empty; requests authenticate explicitly
+    token = response.cookies.get("session_token")
+    client.cookies.clear()
+    return token, response.json()["user"]
+
+
+def auth(token):
+    return {"Cookie": f"session_token={token}"}
+
+
+async def gather_bounded(coros, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(run(coro) for coro in coros))
+
+
+async def seed(base_url, args, rng):
+    recorder = Recorder()
+    recorder.enabled = False
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        sessions = await gather_bounded([login(client, recorder) for _ in range(args.users)], args.concurrency)
+        tokens = [token for token, _ in sessions]
+
+        async def create_blog(i):
+            token = rng.choice(tokens)
+            paragraphs = "\n\n".join(sentence(rng, rng.randint(40, 120)) for _ in range(rng.randint(3, 30)))
+            response = await client.post("/api/blogs", headers=auth(token), data={
+                "title": sentence(rng, rng.randint(3, 8)).title(),
+                "content": f"# {sentence(rng, 4)}\n\n{paragraphs}",
+                "is_published": "true" if rng.random() < 0.9 else "false",
+            })
+            response.raise_for_status()
+            return response.json()
+
+        blogs = await gather_bounded([create_blog(i) for i in range(args.blogs)], args.concurrency)
+        published = [blog["id"] for blog in blogs if blog["is_published"]]
+
+        async def add_comment(_):
+            await client.post(f"/api/blogs/{rng.choice(published)}/comments",
+                              headers=auth(rng.choice(tokens)),
+                              data={"text": sentence(rng, rng.randint(5, 40))})
+
+        async def add_like(_):
+            await client.post(f"/api/blogs/{rng.choice(published)}/like",
+                              headers=auth(rng.choice(tokens)), data={"liked": "true"})
+
+        await gather_bounded([add_comment(i) for i in range(args.comments)], args.concurrency)
+        await gather_bounded([add_like(i) for i in range(args.likes)], args.concurrency)
+
+    return tokens, published
+
+
+# -- workload -----------------------------------------------------------------
+
+async def run_workload(base_url, args, tokens, blog_ids, rng):
+    recorder = Recorder()
+    mix = dict(DEFAULT_MIX)
+    for override in args.mix:
+        name, _, weight = override.partition("=")
+        mix[name] = int(weight)
+    actions, weights = zip(*[(name, weight) for name, weight in mix.items() if weight > 0])
+    # Skew reads towards a few hot posts, like a viral post would
+    hot_posts = blog_ids[:max(1, len(blog_ids) // 50)]
+
+    def pick_post():
+        return rng.choice(hot_posts) if rng.random() < 0.5 else rng.choice(blog_ids)
+
+    async def worker(client, deadline):
+        cursor = None
+        token = rng.choice(tokens)
+        while time.monotonic() < deadline:
+            action = rng.choices(actions, weights)[0]
+            if action == "feed" or (action == "feed_next_page" and not cursor):
+                response = await recorder.request(client, "GET /api/blogs", "GET", "/api/blogs")
+                cursor = response.headers.get("x-next-cursor") if response is not None else None
+            elif action == "feed_next_page":
+                response = await recorder.request(client, "GET /api/blogs?cursor", "GET", "/api/blogs",
+                                                  params={"cursor": cursor})
+                cursor = response.headers.get("x-next-cursor") if response is not None else None
+            elif action == "read_post":
+                await recorder.request(client, "GET /api/blogs/{id}/page", "GET", f"/api/blogs/{pick_post()}/page",
+                                       headers=auth(token))
+            elif action == "comments":
+                await recorder.request(client, "GET /api/blogs/{id}/comments", "GET",
+                                       f"/api/blogs/{pick_post()}/comments")
+            elif action == "search":
+                term = rng.choice(WORDS)
+                query = term[:rng.randint(2, len(term))]
+                await recorder.request(client, "GET /api/blogs?search", "GET", "/api/blogs", params={"search": query})
+            elif action == "like":
+                await recorder.request(client, "POST /api/blogs/{id}/like", "POST", f"/api/blogs/{pick_post()}/like",
+                                       headers=auth(token))
+            elif action == "comment":
+                await recorder.request(client, "POST /api/blogs/{id}/comments", "POST",
+                                       f"/api/blogs/{pick_post()}/comments", headers=auth(token),
+                                       data={"text": sentence(rng, 12)})
+            elif action == "login":
+                await login(client, recorder)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        if args.warmup:
+            recorder.enabled = False
+            deadline = time.monotonic() + args.warmup
+            await asyncio.gather(*(worker(client, deadline) for _ in range(args.concurrency)))
+            recorder.enabled = True
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(*(worker(client, deadline) for _ in range(args.concurrency)))
+        elapsed = time.monotonic() - started
+
+    return recorder.report(elapsed), elapsed
+
+
+# -- output -------------------------------------------------------------------
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def fmt(value):
+    return f"{value:8.1f}" if value is not None else "       -"
+
+
+def print_report(routes, elapsed, previous=None):
+    total = sum(route["count"] for route in routes.values())
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)\n")
+    header = f"{'route':<34}{'count':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+    if previous:
+        header += f"{'p95 prev':>10}{'delta':>9}"
+    print(header)
+    for name, route in routes.items():
+        line = (f"{name:<34}{route['count']:>8}{route['errors']:>6}{route['throughput_rps']:>9.1f}"
+                f"{fmt(route['p50_ms'])} {fmt(route['p95_ms'])} {fmt(route['p99_ms'])}")
+        before = (previous or {}).get(name)
+        if before and before.get("p95_ms") and route["p95_ms"]:
+            delta = (route["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+            line += f"{fmt(before['p95_ms'])}  {delta:+6.1f}%"
+        print(line)
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix="nightblog-bench-")
+    provider, provider_url = start_stub_provider()
+    mongod = server = None
+    db_name = f"nightblog_bench_{uuid.uuid4().hex[:8]}"
+    mongo_url = args.mongo_url
+    try:
+        if args.start_mongod:
+            mongod, mongo_url = start_mongod(workdir)
+        server, base_url = start_server(args, workdir, provider_url, mongo_url, db_name)
+        # The in-memory client has no topology to report readiness from
+        await wait_until_up(server, base_url, path="/api/" if args.memory else "/api/ready")
+
+        print(f"Seeding {args.users} users, {args.blogs} blogs, {args.comments} comments, {args.likes} likes...")
+        seed_started = time.monotonic()
+        tokens, blog_ids = await seed(base_url, args, rng)
+        print(f"Seeded in {time.monotonic() - seed_started:.1f}s; running {args.duration}s "
+              f"with {args.concurrency} concurrent clients")
+
+        routes, elapsed = await run_workload(base_url, args, tokens, blog_ids, rng)
+    finally:
+        stop(server)
+        stop(mongod)
+        provider.shutdown()
+        if mongo_url and not args.memory and not args.start_mongod:
+            from pymongo import MongoClient
+            MongoClient(mongo_url).drop_database(db_name)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    previous = None
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text())["routes"]
+    print_report(routes, elapsed, previous)
+
+    result = {
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "backend": "memory" if args.memory else "mongod",
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "elapsed_s": elapsed,
+        "routes": routes,
+    }
+    output = Path(args.output or ROOT_DIR / "bench_results" / f"{result['revision'] or 'local'}-{int(time.time())}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"\nResults written to {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    backend = parser.add_mutually_exclusive_group()
+    backend.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    backend.add_argument("--start-mongod", action="store_true", help="launch a private mongod from PATH")
+    backend.add_argument("--memory", action="store_true", help="use the in-memory stand-in (mongomock-motor)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes (mongod only)")
+    parser.add_argument("--session-mode", choices=("store", "signed"), default="store")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--blogs", type=int, default=500)
+    parser.add_argument("--comments", type=int, default=2000)
+    parser.add_argument("--likes", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before measuring")
+    parser.add_argument("--mix", action="append", default=[], metavar="ACTION=WEIGHT",
+                        help=f"override workload weights; actions: {', '.join(DEFAULT_MIX)}")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="results JSON path (default bench_results/<rev>-<time>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to diff p95 against")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
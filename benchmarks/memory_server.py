@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Run backend/server.py against an in-memory MongoDB stand-in.
+
+Used by load_test.py when no mongod is available. Needs the optional
+mongomock-motor package; numbers are only comparable with other in-memory
+runs, not with a real mongod.
+
+    python benchmarks/memory_server.py --port 8001
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+
+    try:
+        import mongomock_motor
+    except ImportError:
+        sys.exit("memory mode needs mongomock-motor: pip install mongomock-motor")
+
+    import motor.motor_asyncio
+    import uvicorn
+
+    motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.chdir(BACKEND_DIR)
+
+    import server
+
+    uvicorn.run(server.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
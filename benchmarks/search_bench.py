@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Latency benchmark for the in-process blog search index.
+
+Generates a synthetic corpus (100k posts by default), builds the index and
+times exact, prefix and multi-term queries against it, with the old
+unanchored regex scan over title/username as a baseline.
+
+    python benchmarks/search_bench.py --posts 100000 --queries 500
+"""
+import argparse
+import itertools
+import random
+import re
+import string
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from search import SearchIndex  # noqa: E402
+
+
+def make_vocabulary(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))))
+    return sorted(words)
+
+
+def make_corpus(count, vocabulary, rng, words_per_post):
+    # Zipf-ish word frequencies so a few terms are very common, like real text
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    authors = [f"author_{i}" for i in range(max(1, count // 20))]
+    start = datetime.now(timezone.utc) - timedelta(days=365)
+    for i in range(count):
+        yield {
+            "id": f"blog-{i}",
+            "title": " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(3, 8))),
+            "content": " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=words_per_post)),
+            "username": rng.choice(authors),
+            "created_at": start + timedelta(minutes=i),
+        }
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def report(name, samples):
+    print(f"{name:<22} n={len(samples):<5} p50={percentile(samples, 50):8.3f}ms "
+          f"p95={percentile(samples, 95):8.3f}ms p99={percentile(samples, 99):8.3f}ms")
+
+
+def time_queries(fn, queries):
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--words-per-post", type=int, default=300)
+    parser.add_argument("--vocabulary", type=int, default=30_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--baseline-queries", type=int, default=20,
+                        help="regex scan queries to run (slow on large corpora)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(args.vocabulary, rng)
+    corpus = list(make_corpus(args.posts, vocabulary, rng, args.words_per_post))
+
+    index = SearchIndex()
+    started = time.perf_counter()
+    for blog in corpus:
+        index.add(blog)
+    print(f"Indexed {len(index)} posts in {time.perf_counter() - started:.2f}s")
+
+    common = vocabulary[:200]
+    rare = vocabulary[-5000:]
+    workloads = {
+        "exact (common)": [rng.choice(common) for _ in range(args.queries)],
+        "exact (rare)": [rng.choice(rare) for _ in range(args.queries)],
+        "prefix (2-3 chars)": [rng.choice(vocabulary)[:rng.randint(2, 3)] for _ in range(args.queries)],
+        "two terms": [f"{rng.choice(common)} {rng.choice(vocabulary)[:4]}" for _ in range(args.queries)],
+    }
+    for name, queries in workloads.items():
+        report(name, time_queries(lambda q: index.search(q, limit=20), queries))
+
+    def regex_scan(query):
+        pattern = re.compile(re.escape(query), re.IGNORECASE)
+        return [blog["id"] for blog in corpus
+                if pattern.search(blog["title"]) or pattern.search(blog["username"])][:20]
+
+    report("regex scan baseline", time_queries(regex_scan, [rng.choice(rare) for _ in range(args.baseline_queries)]))
+
+
+if __name__ == "__main__":
+    main()
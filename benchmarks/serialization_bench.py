@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Serialization cost per endpoint shape: FastAPI's default path vs orjson.
+
+"before" is what the handlers used to do: pydantic re-validation where they
+rebuilt models, then jsonable_encoder and Starlette's json.dumps render.
+"after" is model_construct for DB documents and FastJSONResponse's orjson
+render.
+
+    python benchmarks/serialization_bench.py --body-kb 50 --iterations 200
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import BaseModel, ConfigDict  # noqa: E402
+from typing import Optional  # noqa: E402
+
+from responses import dumps  # noqa: E402
+from summaries import SUMMARY_PROJECTION, summarize  # noqa: E402
+
+
+# Mirrors server.Blog; importing server would open a Mongo client
+class Blog(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    user_id: str
+    username: str
+    title: str
+    cover_image: Optional[str] = None
+    cover_image_id: Optional[str] = None
+    content: str
+    excerpt: str = ""
+    word_count: int = 0
+    reading_time: int = 1
+    is_published: bool = False
+    likes: int = 0
+    views: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+
+def make_blog(body_kb, now):
+    paragraph = "Lorem **ipsum** dolor sit amet, consectetur [adipiscing](http://example.com) elit. "
+    content = ("## Section\n\n" + paragraph * 12 + "\n\n") * max(1, body_kb * 1024 // 1100)
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": str(uuid.uuid4()),
+        "username": "prolific_author",
+        "title": "A fairly long blog post title for benchmarking",
+        "cover_image": "https://res.cloudinary.com/demo/image/upload/nightblog/covers/cover.jpg",
+        "cover_image_id": "nightblog/covers/cover",
+        "content": content,
+        **summarize(content),
+        "is_published": True,
+        "likes": 1234,
+        "views": 56789,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def make_comment(blog_id, now, i):
+    return {
+        "id": str(uuid.uuid4()),
+        "blog_id": blog_id,
+        "user_id": str(uuid.uuid4()),
+        "username": f"reader_{i}",
+        "user_picture": "https://res.cloudinary.com/demo/image/upload/nightblog/profiles/p.jpg",
+        "text": "Great post, thanks for writing it up! " * 3,
+        "created_at": now - timedelta(minutes=i),
+    }
+
+
+def summary(blog):
+    return {key: blog[key] for key in SUMMARY_PROJECTION if key in blog}
+
+
+def render_default(content):
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def timed(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--body-kb", type=int, default=50, help="Markdown body size of each post")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    blogs = [make_blog(args.body_kb, now - timedelta(hours=i)) for i in range(50)]
+    blog = blogs[0]
+    comments = [make_comment(blog["id"], now, i) for i in range(50)]
+    user = {"id": blog["user_id"], "email": "a@example.com", "name": "Author", "username": "prolific_author",
+            "picture": None, "bio": "Writes a lot.", "theme_color": "#00ff88", "created_at": now}
+
+    workloads = {
+        "GET /blogs (20 cards)": (
+            lambda: render_default([summary(b) for b in blogs[:20]]),
+            lambda: dumps([summary(b) for b in blogs[:20]]),
+        ),
+        "GET /blogs/{id}": (
+            lambda: render_default(blog),
+            lambda: dumps(blog),
+        ),
+        "GET /blogs/{id}/comments": (
+            lambda: render_default(comments),
+            lambda: dumps(comments),
+        ),
+        "GET /users/{username}": (
+            lambda: render_default({"user": user, "blogs": [summary(b) for b in blogs]}),
+            lambda: dumps({"user": user, "blogs": [summary(b) for b in blogs]}),
+        ),
+        "PUT /blogs/{id} (model)": (
+            lambda: render_default(Blog(**blog)),
+            lambda: dumps(Blog.model_construct(**blog)),
+        ),
+    }
+
+    print(f"median per response, {args.body_kb} KB bodies, {args.iterations} iterations")
+    print(f"{'endpoint':<28}{'before':>12}{'after':>12}{'speedup':>10}")
+    for name, (before, after) in workloads.items():
+        before_us = timed(before, args.iterations)
+        after_us = timed(after, args.iterations)
+        print(f"{name:<28}{before_us:>10.1f}us{after_us:>10.1f}us{before_us / after_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useContext } from 'react';
+import React, { useState, useEffect, useContext, useRef } from 'react';
 import { useNavigate, useParams } from 'react-router-dom';
 import axios from 'axios';
 import { AuthContext, API } from '@/App';
@@ -23,6 +23,10 @@ const BlogEditor = () => {
   const [showPreview, setShowPreview] = useState(false);
   const [saving, setSaving] = useState(false);
   const [loading, setLoading] = useState(false);
+  const [revision, setRevision] = useState(null);
+  const [autosaveStatus, setAutosaveStatus] = useState('');
+  // Last title/content/published state known to be on the server, to send only what changed
+  const savedRef = useRef({ title: '', content: '', isPublished: false });
 
   useEffect(() => {
     if (blogId) {
@@ -30,14 +34,54 @@ const BlogEditor = () => {
     }
   }, [blogId]);
 
+  useEffect(() => {
+    // Autosave writes to the post itself, so it only runs on drafts; a live
+    // post changes only when Save is pressed
+    if (!blogId || revision === null || isPublished || savedRef.current.isPublished) return;
+    const changes = {};
+    if (title !== savedRef.current.title && title.trim()) changes.title = title;
+    if (content !== savedRef.current.content && content.trim()) changes.content = content;
+    if (Object.keys(changes).length === 0) return;
+
+    const timer = setTimeout(() => autosave(changes), 3000);
+    return () => clearTimeout(timer);
+  }, [title, content, revision, isPublished]);
+
+  const autosave = async (changes) => {
+    try {
+      setAutosaveStatus('Saving...');
+      const response = await axios.patch(`${API}/blogs/${blogId}`, { revision, ...changes });
+      savedRef.current = {
+        title: response.data.title,
+        content: response.data.content,
+        isPublished: response.data.is_published
+      };
+      setRevision(response.data.revision);
+      setAutosaveStatus('Draft saved');
+    } catch (error) {
+      if (error.response?.status === 409) {
+        // Stop autosaving over someone else's changes until the page is reloaded
+        setRevision(null);
+        setAutosaveStatus('');
+        toast.error('This post was changed elsewhere. Reload to get the latest version.');
+      } else {
+        setAutosaveStatus('Autosave failed');
+      }
+    }
+  };
+
   const fetchBlog = async () => {
     try {
       setLoading(true);
-      const response = await axios.get(`${API}/blogs/${blogId}`);
+      const response = await axios.get(`${API}/blogs/${blogId}`, {
+        params: { count_view: false }
+      });
       const blog = response.data;
       setTitle(blog.title);
       setContent(blog.content);
       setIsPublished(blog.is_published);
+      savedRef.current = { title: blog.title, content: blog.content, isPublished: blog.is_published };
+      setRevision(blog.revision || 0);
       if (blog.cover_image) {
         setCoverImagePreview(blog.cover_image);
       }
@@ -74,9 +118,15 @@ const BlogEditor = () => {
       }
 
       if (blogId) {
-        await axios.put(`${API}/blogs/${blogId}`, formData, {
+        const response = await axios.put(`${API}/blogs/${blogId}`, formData, {
           headers: { 'Content-Type': 'multipart/form-data' }
         });
+        savedRef.current = {
+          title: response.data.title,
+          content: response.data.content,
+          isPublished: response.data.is_published
+        };
+        setRevision(response.data.revision);
         toast.success('Blog updated successfully');
       } else {
         const response = await axios.post(`${API}/blogs`, formData, {
@@ -128,6 +178,11 @@ const BlogEditor = () => {
           </Button>
 
           <div className="flex items-center gap-3">
+            {autosaveStatus && (
+              <span className="text-sm text-gray-500" data-testid="autosave-status">
+                {autosaveStatus}
+              </span>
+            )}
             <Button
               data-testid="preview-btn"
               variant="outline"
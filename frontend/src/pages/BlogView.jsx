@@ -24,6 +24,7 @@ const BlogView = () => {
   const { user } = useContext(AuthContext);
   const navigate = useNavigate();
   const [blog, setBlog] = useState(null);
+  const [author, setAuthor] = useState(null);
   const [comments, setComments] = useState([]);
   const [newComment, setNewComment] = useState('');
   const [liked, setLiked] = useState(false);
@@ -33,40 +34,56 @@ const BlogView = () => {
   const shareUrl = window.location.href;
 
   useEffect(() => {
-    fetchBlog();
-    fetchComments();
-    if (user) {
-      checkLiked();
-    }
+    fetchPage();
   }, [blogId, user]);
 
-  const fetchBlog = async () => {
-    try {
-      const response = await axios.get(`${API}/blogs/${blogId}`);
-      setBlog(response.data);
-    } catch (error) {
-      toast.error('Blog not found');
-      navigate('/feed');
-    } finally {
-      setLoading(false);
-    }
-  };
+  // Live comments and like counts from other readers
+  useEffect(() => {
+    const events = new EventSource(`${API}/blogs/${blogId}/events`, { withCredentials: true });
+    events.addEventListener('comment', (e) => {
+      const comment = JSON.parse(e.data);
+      setComments((prev) => (prev.some((c) => c.id === comment.id) ? prev : [comment, ...prev]));
+    });
+    events.addEventListener('likes', (e) => {
+      const { likes } = JSON.parse(e.data);
+      setBlog((prev) => (prev ? { ...prev, likes } : prev));
+    });
+    // Events sent while disconnected, or after being dropped as a slow reader, are lost; catch up on reconnect
+    let opened = false;
+    events.addEventListener('open', () => {
+      if (opened) refreshLive();
+      opened = true;
+    });
+    return () => events.close();
+  }, [blogId]);
 
-  const fetchComments = async () => {
+  const refreshLive = async () => {
     try {
-      const response = await axios.get(`${API}/blogs/${blogId}/comments`);
-      setComments(response.data);
+      const response = await axios.get(`${API}/blogs/${blogId}/page`, { params: { count_view: false } });
+      const { blog: fresh, comments: latest } = response.data;
+      setBlog((prev) => (prev ? { ...prev, likes: fresh.likes } : prev));
+      setComments((prev) => {
+        const known = new Set(prev.map((c) => c.id));
+        return [...latest.filter((c) => !known.has(c.id)), ...prev];
+      });
     } catch (error) {
-      console.error('Failed to fetch comments');
+      // Keep what is shown; the next reconnect tries again
     }
   };
 
-  const checkLiked = async () => {
+  // Post, author, first page of comments and liked state in one request
+  const fetchPage = async () => {
     try {
-      const response = await axios.get(`${API}/blogs/${blogId}/liked`);
+      const response = await axios.get(`${API}/blogs/${blogId}/page`);
+      setBlog(response.data.blog);
+      setAuthor(response.data.author);
+      setComments(response.data.comments);
       setLiked(response.data.liked);
     } catch (error) {
-      console.error('Failed to check like status');
+      toast.error('Blog not found');
+      navigate('/feed');
+    } finally {
+      setLoading(false);
     }
   };
 
@@ -77,12 +94,14 @@ const BlogView = () => {
     }
 
     try {
-      const response = await axios.post(`${API}/blogs/${blogId}/like`);
+      // Send the desired state so double clicks and retries are idempotent
+      const formData = new FormData();
+      formData.append('liked', !liked);
+      const response = await axios.post(`${API}/blogs/${blogId}/like`, formData);
       setLiked(response.data.liked);
-      setBlog((prev) => ({
-        ...prev,
-        likes: prev.likes + (response.data.liked ? 1 : -1),
-      }));
+      if (response.data.likes !== undefined) {
+        setBlog((prev) => ({ ...prev, likes: response.data.likes }));
+      }
     } catch (error) {
       toast.error('Failed to like');
     }
@@ -110,7 +129,7 @@ const BlogView = () => {
         { headers: { 'Content-Type': 'multipart/form-data' } }
       );
 
-      setComments([response.data, ...comments]);
+      setComments((prev) => (prev.some((c) => c.id === response.data.id) ? prev : [response.data, ...prev]));
       setNewComment('');
       toast.success('Comment added');
     } catch (error) {
@@ -188,6 +207,7 @@ const BlogView = () => {
               onClick={() => navigate(`/profile/${blog.username}`)}
             >
               <Avatar className="w-12 h-12">
+                <AvatarImage src={author?.picture} />
                 <AvatarFallback className="bg-[#1a1a1a]">{blog.username[0]}</AvatarFallback>
               </Avatar>
               <div>
@@ -13,18 +13,19 @@ const Dashboard = () => {
   const navigate = useNavigate();
   const [blogs, setBlogs] = useState([]);
   const [searchQuery, setSearchQuery] = useState('');
+  const [feed, setFeed] = useState('latest');
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     fetchBlogs();
   }, []);
 
-  const fetchBlogs = async (query = '') => {
+  const fetchBlogs = async (query = '', mode = 'latest') => {
     try {
       setLoading(true);
-      const response = await axios.get(`${API}/blogs`, {
-        params: { search: query }
-      });
+      const response = mode === 'trending' && !query
+        ? await axios.get(`${API}/blogs/trending`)
+        : await axios.get(`${API}/blogs`, { params: { search: query } });
       setBlogs(response.data);
     } catch (error) {
       toast.error('Failed to fetch blogs');
@@ -35,7 +36,13 @@ const Dashboard = () => {
 
   const handleSearch = (e) => {
     e.preventDefault();
-    fetchBlogs(searchQuery);
+    fetchBlogs(searchQuery, feed);
+  };
+
+  const switchFeed = (mode) => {
+    setFeed(mode);
+    setSearchQuery('');
+    fetchBlogs('', mode);
   };
 
   const handleLogout = async () => {
@@ -122,6 +129,24 @@ const Dashboard = () => {
           </div>
         </form>
 
+        {/* Feed Tabs */}
+        <div className="flex gap-3 mb-6">
+          {['latest', 'trending'].map((mode) => (
+            <Button
+              key={mode}
+              data-testid={`feed-tab-${mode}`}
+              onClick={() => switchFeed(mode)}
+              className={`rounded-full capitalize ${
+                feed === mode
+                  ? 'bg-[#00ff88] hover:bg-[#00dd77] text-black font-semibold'
+                  : 'bg-[#1a1a1a] hover:bg-[#2a2a2a] text-gray-300'
+              }`}
+            >
+              {mode}
+            </Button>
+          ))}
+        </div>
+
         {/* Blog Feed */}
         {loading ? (
           <div className="text-center py-12">
@@ -188,7 +213,7 @@ const Dashboard = () => {
                   </h2>
 
                   <p className="text-gray-400 line-clamp-3 mb-4">
-                    {blog.content.substring(0, 200)}...
+                    {blog.excerpt}
                   </p>
 
                   <div className="flex items-center gap-6 text-gray-500">
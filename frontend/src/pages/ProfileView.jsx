@@ -12,7 +12,10 @@ const ProfileView = () => {
   const { user } = useContext(AuthContext);
   const navigate = useNavigate();
   const [profile, setProfile] = useState(null);
+  const [stats, setStats] = useState(null);
   const [blogs, setBlogs] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
@@ -24,7 +27,9 @@ const ProfileView = () => {
       setLoading(true);
       const response = await axios.get(`${API}/users/${username}`);
       setProfile(response.data.user);
+      setStats(response.data.stats);
       setBlogs(response.data.blogs);
+      setNextCursor(response.data.next_cursor);
     } catch (error) {
       toast.error('User not found');
       navigate('/feed');
@@ -33,6 +38,21 @@ const ProfileView = () => {
     }
   };
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await axios.get(`${API}/users/${username}`, {
+        params: { cursor: nextCursor }
+      });
+      setBlogs((prev) => [...prev, ...response.data.blogs]);
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      toast.error('Failed to load more posts');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) {
     return (
       <div className="min-h-screen bg-[#0a0a0a] flex items-center justify-center">
@@ -110,12 +130,20 @@ const ProfileView = () => {
                 {profile.bio || 'No bio yet.'}
               </p>
               <div className="flex items-center justify-center md:justify-start gap-6 text-gray-400">
-                <div>
+                <div data-testid="profile-post-count">
                   <span className="text-2xl font-bold" style={{ color: themeColor }}>
-                    {blogs.length}
+                    {stats ? stats.post_count : blogs.length}
                   </span>
                   <span className="ml-2">Posts</span>
                 </div>
+                <div className="flex items-center gap-2" data-testid="profile-total-views">
+                  <Eye className="w-5 h-5" />
+                  <span>{stats?.total_views || 0}</span>
+                </div>
+                <div className="flex items-center gap-2" data-testid="profile-total-likes">
+                  <Heart className="w-5 h-5" />
+                  <span>{stats?.total_likes || 0}</span>
+                </div>
               </div>
             </div>
           </div>
@@ -169,7 +197,7 @@ const ProfileView = () => {
                       {blog.title}
                     </h3>
                     <p className="text-gray-400 line-clamp-2 mb-4">
-                      {blog.content.substring(0, 150)}...
+                      {blog.excerpt}
                     </p>
                     <div className="flex items-center gap-4 text-gray-500">
                       <div className="flex items-center gap-2">
@@ -189,6 +217,19 @@ const ProfileView = () => {
               ))}
             </div>
           )}
+
+          {nextCursor && (
+            <div className="flex justify-center mt-8">
+              <Button
+                data-testid="load-more-btn"
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="bg-[#00ff88] hover:bg-[#00dd77] text-black font-semibold rounded-full"
+              >
+                {loadingMore ? 'Loading...' : 'Load More'}
+              </Button>
+            </div>
+          )}
         </div>
       </div>
     </div>
@@ -0,0 +1,75 @@
+import asyncio
+
+from indexes import DEPRECATED, INDEXES, ensure_indexes
+
+
+class FakeCollection:
+    def __init__(self):
+        self.indexes = {"_id_": {"key": [("_id", 1)]}}
+
+    async def index_information(self):
+        return dict(self.indexes)
+
+    async def create_indexes(self, models):
+        for model in models:
+            document = model.document
+            self.indexes[document["name"]] = {
+                "key": list(document["key"].items()),
+                **{k: v for k, v in document.items() if k not in ("key", "name")},
+            }
+
+    async def drop_index(self, name):
+        del self.indexes[name]
+
+
+class FakeDB(dict):
+    def __missing__(self, name):
+        collection = self[name] = FakeCollection()
+        return collection
+
+
+def test_creates_declared_and_keeps_undeclared_indexes():
+    async def run():
+        db = FakeDB()
+        db["blogs"].indexes["operator_added"] = {"key": [("title", 1)]}
+        db["blogs"].indexes["published_feed"] = {"key": [("is_published", 1), ("created_at", -1)]}
+        report = await ensure_indexes(db)
+        assert "operator_added" in db["blogs"].indexes
+        # Still needed by older versions during a rolling deploy
+        assert "published_feed" in db["blogs"].indexes
+        assert report["deprecated"] == ["blogs.published_feed"]
+        assert report["dropped"] == []
+        for collection_name, models in INDEXES.items():
+            for model in models:
+                assert model.document["name"] in db[collection_name].indexes
+
+        report = await ensure_indexes(db)
+        assert report["created"] == []
+
+    asyncio.run(run())
+
+
+def test_conflicting_definition_is_left_alone():
+    async def run():
+        db = FakeDB()
+        db["users"].indexes["email_unique"] = {"key": [("email", 1)]}
+        report = await ensure_indexes(db)
+        assert report["conflicting"] == ["users.email_unique"]
+        assert "unique" not in db["users"].indexes["email_unique"]
+
+    asyncio.run(run())
+
+
+def test_deprecated_indexes_are_dropped_only_when_asked():
+    async def run():
+        db = FakeDB()
+        for collection_name, names in DEPRECATED.items():
+            for name in names:
+                db[collection_name].indexes[name] = {"key": [("x", 1)]}
+        await ensure_indexes(db, dry_run=True, drop_deprecated=True)
+        assert "published_feed" in db["blogs"].indexes
+        report = await ensure_indexes(db, drop_deprecated=True)
+        assert sorted(report["dropped"]) == ["blogs.author_feed", "blogs.published_feed", "comments.blog_comments"]
+        assert "published_feed" not in db["blogs"].indexes
+
+    asyncio.run(run())
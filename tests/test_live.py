@@ -0,0 +1,55 @@
+import asyncio
+
+from live import LiveHub, stream
+
+
+def test_unstarted_stream_holds_no_subscription():
+    async def run():
+        hub = LiveHub(max_subscribers=1)
+        body = stream(hub, "blog-1")
+        # A client that disconnects before the body is iterated
+        await body.aclose()
+        assert hub.stats()["subscribers"] == 0
+        assert not hub.full()
+
+    asyncio.run(run())
+
+
+def test_stream_subscribes_on_first_iteration_and_releases_on_close():
+    async def run():
+        hub = LiveHub()
+        body = stream(hub, "blog-1", heartbeat=0.01)
+        assert await body.__anext__() == b"retry: 3000\n\n"
+        assert hub.stats()["subscribers"] == 1
+        assert await body.__anext__() == b": ping\n\n"
+        hub.publish("blog-1", "likes", {"likes": 3})
+        assert await body.__anext__() == b'event: likes\ndata: {"likes":3}\n\n'
+        await body.aclose()
+        assert hub.stats()["subscribers"] == 0
+
+    asyncio.run(run())
+
+
+def test_stream_ends_when_the_last_slot_was_taken():
+    async def run():
+        hub = LiveHub(max_subscribers=1)
+        other = hub.subscribe("blog-1")
+        assert [frame async for frame in stream(hub, "blog-1")] == []
+        hub.unsubscribe(other)
+        assert hub.stats()["subscribers"] == 0
+
+    asyncio.run(run())
+
+
+def test_slow_subscriber_is_dropped_once():
+    async def run():
+        hub = LiveHub(max_queue=2)
+        body = stream(hub, "blog-1", heartbeat=1)
+        await body.__anext__()
+        for likes in range(5):
+            hub.publish("blog-1", "likes", {"likes": likes})
+        assert hub.stats()["dropped"] == 1
+        assert [frame async for frame in body] == []
+        assert hub.stats()["subscribers"] == 0
+
+    asyncio.run(run())
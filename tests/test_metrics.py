@@ -0,0 +1,24 @@
+from metrics import render_stats
+
+
+def test_render_stats_splits_counters_from_gauges():
+    lines = render_stats(
+        "single_flight", "Hot reads.", {"calls": 5, "inflight": 1, "enabled": True, "name": "x"},
+        counters=("calls",),
+    )
+    assert lines == [
+        "# HELP single_flight Hot reads.",
+        "# TYPE single_flight gauge",
+        'single_flight{stat="inflight"} 1',
+        "# HELP single_flight_total Hot reads.",
+        "# TYPE single_flight_total counter",
+        'single_flight_total{stat="calls"} 5',
+    ]
+
+
+def test_render_stats_skips_empty_families():
+    assert render_stats("live_hub", "Dropped.", {"dropped": 2}, counters=("dropped",)) == [
+        "# HELP live_hub_total Dropped.",
+        "# TYPE live_hub_total counter",
+        'live_hub_total{stat="dropped"} 2',
+    ]
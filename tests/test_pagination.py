@@ -0,0 +1,121 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from pagination import (
+    InvalidCursor, _encode, decode_offset_cursor, encode_cursor, encode_offset_cursor, fetch_page, keyset_query,
+)
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(doc, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not doc[key] < condition["$lt"]:
+                return False
+        elif doc[key] != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.docs.sort(key=lambda doc: doc[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        return FakeCursor([dict(doc) for doc in self.docs if _matches(doc, query)])
+
+
+def test_keyset_query_without_cursor_is_unchanged():
+    query = {"blog_id": "b1"}
+    assert keyset_query(query, None) is query
+
+
+def test_keyset_query_continues_after_the_cursor_position():
+    cursor = encode_cursor({"created_at": T0, "id": "m"})
+    assert keyset_query({"blog_id": "b1"}, cursor) == {
+        "blog_id": "b1",
+        "$or": [
+            {"created_at": {"$lt": T0}},
+            {"created_at": T0, "id": {"$lt": "m"}},
+        ],
+    }
+
+
+def test_naive_datetimes_are_encoded_as_utc():
+    naive = encode_cursor({"created_at": T0.replace(tzinfo=None), "id": "m"})
+    assert naive == encode_cursor({"created_at": T0, "id": "m"})
+
+
+def test_offset_cursor_round_trip():
+    assert decode_offset_cursor(encode_offset_cursor(40)) == 40
+
+
+@pytest.mark.parametrize("cursor", ["", "%%%", "bm90IGpzb24", _encode({"k": 1})])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_offset_cursor(cursor)
+    if cursor:
+        with pytest.raises(InvalidCursor):
+            keyset_query({}, cursor)
+
+
+@pytest.mark.parametrize("payload", [["o", -1], ["o", "3"], ["o", 1, 2], ["x", 1]])
+def test_bad_offset_payloads_are_rejected(payload):
+    with pytest.raises(InvalidCursor):
+        decode_offset_cursor(_encode(payload))
+
+
+def test_bad_keyset_payloads_are_rejected():
+    with pytest.raises(InvalidCursor):
+        keyset_query({}, _encode(["k", "not a date", "m"]))
+    with pytest.raises(InvalidCursor):
+        keyset_query({}, _encode(["k", T0.isoformat()]))
+
+
+def test_cursors_of_the_other_kind_are_rejected():
+    with pytest.raises(InvalidCursor):
+        keyset_query({}, encode_offset_cursor(20))
+    with pytest.raises(InvalidCursor):
+        decode_offset_cursor(encode_cursor({"created_at": T0, "id": "m"}))
+
+
+def test_pages_split_on_id_when_timestamps_tie():
+    # Five documents share a timestamp, so only the id orders them
+    docs = [{"id": f"{i:02d}", "created_at": T0} for i in range(5)]
+    docs += [{"id": "zz", "created_at": T0 + timedelta(seconds=1)}, {"id": "aa", "created_at": T0 - timedelta(seconds=1)}]
+    collection = FakeCollection(docs)
+
+    async def run():
+        seen, cursor = [], None
+        # Bounded, so a cursor that repeats a page fails instead of looping
+        for _ in range(len(docs)):
+            page, cursor = await fetch_page(collection, {}, cursor=cursor, limit=2)
+            seen.append([doc["id"] for doc in page])
+            if cursor is None:
+                break
+        return seen
+
+    assert asyncio.run(run()) == [["zz", "04"], ["03", "02"], ["01", "00"], ["aa"]]
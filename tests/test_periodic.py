@@ -0,0 +1,24 @@
+import asyncio
+
+from periodic import run_periodically
+
+
+def test_failures_are_logged_and_the_loop_carries_on(caplog):
+    async def run():
+        calls = []
+
+        async def job():
+            calls.append(len(calls))
+            if len(calls) == 1:
+                raise RuntimeError("transient")
+            return len(calls)
+
+        task = asyncio.create_task(run_periodically(job, 0.01, "Test job"))
+        while len(calls) < 3:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert task.cancelled()
+
+    asyncio.run(run())
+    assert "Test job failed" in caplog.text
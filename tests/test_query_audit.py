@@ -0,0 +1,90 @@
+from query_audit import analyze_explain, command_shape, strip_values
+
+
+def _find_explain(plan, returned=2, examined=100):
+    return {
+        "queryPlanner": {"winningPlan": plan},
+        "executionStats": {"nReturned": returned, "totalDocsExamined": examined},
+    }
+
+
+def test_strip_values_keeps_fields_and_operators():
+    query = {
+        "blog_id": "b1",
+        "created_at": {"$lt": "2026-01-01"},
+        "$or": [{"is_published": True}, {"user_id": {"$in": ["u1", "u2"]}}],
+        "author": {"name": "x"},
+    }
+    assert strip_values(query) == {
+        "blog_id": "?",
+        "created_at": {"$lt": "?"},
+        "$or": [{"is_published": "?"}, {"user_id": {"$in": "?"}}],
+        # A plain sub-document is a value, not an operator expression
+        "author": "?",
+    }
+    assert strip_values("not a dict") == "?"
+
+
+def test_command_shape_of_find_and_writes():
+    find = {"find": "blogs", "filter": {"username": "alice", "is_published": True}, "sort": {"created_at": -1, "id": -1}}
+    assert command_shape("find", find) == ({"username": "?", "is_published": "?"}, ["created_at", "id"])
+
+    update = {"update": "blogs", "updates": [{"q": {"id": "b1"}, "u": {"$inc": {"likes": 1}}}, {"q": {"x": 1}}]}
+    assert command_shape("update", update) == ({"id": "?"}, [])
+    assert command_shape("delete", {"delete": "likes", "deletes": []}) == ({}, [])
+    assert command_shape("count", {"count": "comments", "query": {"blog_id": "b1"}}) == ({"blog_id": "?"}, [])
+
+
+def test_command_shape_of_aggregate():
+    pipeline = [
+        {"$match": {"id": "b1"}},
+        {"$sort": {"created_at": -1}},
+        {"$lookup": {"from": "users"}},
+    ]
+    assert command_shape("aggregate", {"aggregate": "blogs", "pipeline": pipeline}) == (
+        [{"$match": {"id": "?"}}, {"$sort": ["created_at"]}, "$lookup"],
+        [],
+    )
+
+
+def test_collscan_behind_a_filter_is_flagged():
+    explain = _find_explain({"stage": "COLLSCAN", "filter": {"username": {"$eq": "alice"}}})
+    plan = analyze_explain(explain, {"username": "?"})
+    assert plan["stages"] == ["COLLSCAN"]
+    assert plan["flags"] == ["COLLSCAN"]
+    assert plan["examined_per_returned"] == 50.0
+
+
+def test_collscan_without_a_filter_is_not_flagged():
+    plan = analyze_explain(_find_explain({"stage": "COLLSCAN"}, returned=0, examined=7), {})
+    assert plan["flags"] == []
+    # Nothing returned: the ratio is what was examined
+    assert plan["examined_per_returned"] == 7.0
+
+
+def test_index_scan_is_clean():
+    explain = _find_explain({"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "id_unique"}}, 1, 1)
+    plan = analyze_explain(explain, {"id": "?"})
+    assert plan["stages"] == ["FETCH", "IXSCAN"]
+    assert plan["flags"] == []
+
+
+def test_in_memory_sort_is_flagged():
+    explain = _find_explain({"stage": "SORT", "inputStage": {"stage": "IXSCAN"}})
+    plan = analyze_explain(explain, {"username": "?"})
+    assert plan["stages"] == ["SORT", "IXSCAN"]
+    assert plan["flags"] == ["SORT"]
+
+
+def test_leftover_sort_stage_in_an_aggregation_is_flagged():
+    explain = {
+        "stages": [
+            {"$cursor": _find_explain({"stage": "IXSCAN", "indexName": "recent_comments"}, 10, 10)},
+            {"$group": {"_id": "$blog_id"}},
+            {"$sort": {"sortKey": {"score": -1}}},
+        ],
+    }
+    plan = analyze_explain(explain, [{"$match": {"created_at": {"$gte": "?"}}}, "$group", {"$sort": ["score"]}])
+    assert plan["stages"] == ["IXSCAN", "$sort"]
+    assert plan["flags"] == ["SORT"]
+    assert (plan["docs_examined"], plan["docs_returned"]) == (10, 10)
@@ -0,0 +1,60 @@
+import asyncio
+from datetime import datetime, timezone
+
+from search import SearchIndex
+
+
+def blog(blog_id, title, published=True):
+    return {"id": blog_id, "title": title, "content": "body", "username": "author",
+            "is_published": published, "created_at": datetime.now(timezone.utc)}
+
+
+class SnapshotBlogs:
+    """blogs.find() that yields a fixed snapshot and runs `during` halfway through, like a concurrent write."""
+
+    def __init__(self, snapshot, during):
+        self.snapshot = snapshot
+        self.during = during
+
+    def find(self, *args, **kwargs):
+        async def cursor():
+            for i, doc in enumerate(self.snapshot):
+                if i == 1:
+                    self.during()
+                    await asyncio.sleep(0)
+                yield doc
+        return cursor()
+
+
+class FakeDB:
+    def __init__(self, blogs):
+        self.blogs = blogs
+
+
+def test_writes_during_rebuild_are_replayed():
+    async def run():
+        index = SearchIndex()
+        for doc in (blog("deleted", "walrus"), blog("edited", "penguin")):
+            index.add(doc)
+
+        def concurrent_writes():
+            index.remove("deleted")
+            index.sync(blog("edited", "albatross"))
+            index.sync(blog("created", "narwhal"))
+
+        # The snapshot was read before those writes
+        snapshot = [blog("deleted", "walrus"), blog("edited", "penguin"), blog("other", "otter")]
+        count = await index.rebuild(FakeDB(SnapshotBlogs(snapshot, concurrent_writes)))
+
+        assert index.search("walrus") == []
+        assert index.search("penguin") == []
+        assert index.search("albatross") == ["edited"]
+        assert index.search("narwhal") == ["created"]
+        assert index.search("otter") == ["other"]
+        assert count == 3
+
+        # Nothing is logged outside a rebuild
+        index.remove("other")
+        assert index._touched is None
+
+    asyncio.run(run())
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import session_cache
+from session_cache import SessionCache
+
+LATER = datetime.now(timezone.utc) + timedelta(days=1)
+
+
+def user(user_id):
+    return SimpleNamespace(id=user_id)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_evicts_least_recently_used():
+    cache = SessionCache(max_size=2)
+    cache.set("a", user("1"), LATER)
+    cache.set("b", user("2"), LATER)
+    # Reading "a" makes "b" the oldest
+    assert cache.get("a").id == "1"
+    cache.set("c", user("3"), LATER)
+    assert cache.get("b") is None
+    assert cache.get("a").id == "1"
+    assert cache.get("c").id == "3"
+    assert cache.stats()["size"] == 2
+
+
+def test_zero_size_caches_nothing():
+    cache = SessionCache(max_size=0)
+    cache.set("a", user("1"), LATER)
+    assert cache.get("a") is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = SessionCache(ttl=60)
+    cache.set("a", user("1"), LATER)
+    clock[0] += 60
+    assert cache.get("a").id == "1"
+    clock[0] += 1
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_entries_expire_with_the_session():
+    cache = SessionCache(ttl=60)
+    cache.set("a", user("1"), datetime.now(timezone.utc) - timedelta(seconds=1))
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_invalidate_drops_one_token():
+    cache = SessionCache()
+    cache.set("a", user("1"), LATER)
+    cache.set("b", user("1"), LATER)
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert cache.get("a") is None
+    assert cache.get("b").id == "1"
+
+
+def test_invalidate_user_drops_all_their_sessions():
+    cache = SessionCache()
+    cache.set("a", user("1"), LATER)
+    cache.set("b", user("1"), LATER)
+    cache.set("c", user("2"), LATER)
+    cache.invalidate_user("1")
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert cache.get("c").id == "2"
+
+
+def test_counts_hits_and_misses(clock):
+    cache = SessionCache(ttl=10)
+    assert cache.stats()["hit_ratio"] == 0.0
+    cache.get("a")
+    cache.set("a", user("1"), LATER)
+    cache.get("a")
+    cache.get("a")
+    clock[0] += 11
+    # An expired entry counts as a miss
+    cache.get("a")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+    assert stats["hit_ratio"] == 0.5
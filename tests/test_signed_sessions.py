@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from signed_sessions import InvalidToken, SessionGenerations, SessionSigner
+
+
+class FakeGenerationsCollection:
+    """The subset of a Motor collection SessionGenerations uses, shared between "workers"."""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query):
+        doc = self.docs.get(query["_id"])
+        return dict(doc) if doc else None
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"], "generation": 0})
+        doc["generation"] += update["$inc"]["generation"]
+        doc.update(update["$set"])
+        return dict(doc)
+
+    def find(self, query, projection=None):
+        docs = list(self.docs.values())
+
+        async def cursor():
+            for doc in docs:
+                yield dict(doc)
+        return cursor()
+
+
+def test_signer_round_trip_and_tamper():
+    signer = SessionSigner("secret")
+    token, _ = signer.issue("user-1", 3)
+    claims = signer.verify(token)
+    assert (claims.user_id, claims.generation) == ("user-1", 3)
+    with pytest.raises(InvalidToken):
+        SessionSigner("other-secret").verify(token)
+
+
+def test_newer_generation_from_another_worker_is_accepted():
+    async def run():
+        collection = FakeGenerationsCollection()
+        worker_a = SessionGenerations(collection)
+        worker_b = SessionGenerations(collection)
+        await worker_a.start()
+        await worker_b.start()
+        try:
+            # Logout and login again on B; A hasn't polled since
+            generation = await worker_b.bump("user-1")
+            assert worker_a.get("user-1") == 0
+
+            assert await worker_a.accepts("user-1", generation)
+            assert worker_a.get("user-1") == generation
+            # The token from before the logout is now rejected on A too
+            assert not await worker_a.accepts("user-1", generation - 1)
+        finally:
+            await worker_a.stop()
+            await worker_b.stop()
+
+    asyncio.run(run())
+
+
+def test_newer_generation_evicts_cached_sessions():
+    async def run():
+        collection = FakeGenerationsCollection()
+        revoked = []
+        worker_a = SessionGenerations(collection, on_revoke=revoked.append)
+        worker_b = SessionGenerations(collection)
+        generation = await worker_b.bump("user-1")
+        assert await worker_a.accepts("user-1", generation)
+        assert revoked == ["user-1"]
+
+    asyncio.run(run())
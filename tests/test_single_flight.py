@@ -0,0 +1,96 @@
+import asyncio
+
+from single_flight import SingleFlight
+
+
+class Source:
+    """A query whose calls block until released, returning the value current at release."""
+
+    def __init__(self):
+        self.value = "v0"
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def fetch(self):
+        self.calls += 1
+        await self.release.wait()
+        return self.value
+
+
+def test_concurrent_callers_share_one_query():
+    async def run():
+        flight, source = SingleFlight(), Source()
+        callers = [asyncio.ensure_future(flight.do("blog:1", "blog", source.fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        source.release.set()
+        assert await asyncio.gather(*callers) == ["v0"] * 5
+        assert source.calls == 1
+        assert flight.stats()["coalesced"] == 4
+
+    asyncio.run(run())
+
+
+def test_caller_after_invalidate_does_not_join_older_flight():
+    async def run():
+        flight, source = SingleFlight(), Source()
+        before = asyncio.ensure_future(flight.do("blog:1", "blog", source.fetch))
+        await asyncio.sleep(0)
+        # A write lands while the first query is in flight
+        source.value = "v1"
+        flight.invalidate("blog:1")
+        fresh = Source()
+        fresh.value = "v1"
+        fresh.release.set()
+        # Joining the older flight would block on its still-unreleased query
+        assert await asyncio.wait_for(flight.do("blog:1", "blog", fresh.fetch), 1) == "v1"
+        assert fresh.calls == 1
+        source.release.set()
+        await before
+        assert flight.stats()["inflight"] == 0
+
+    asyncio.run(run())
+
+
+def test_invalidate_drops_cached_entry():
+    async def run():
+        flight, source = SingleFlight(ttl=60), Source()
+        source.release.set()
+        assert await flight.do("blog:1", "blog", source.fetch) == "v0"
+        assert await flight.do("blog:1", "blog", source.fetch) == "v0"
+        assert source.calls == 1
+        source.value = "v1"
+        flight.invalidate("blog:1")
+        assert flight.stats()["cached"] == 0
+        assert await flight.do("blog:1", "blog", source.fetch) == "v1"
+        assert source.calls == 2
+
+    asyncio.run(run())
+
+
+def test_invalidated_flight_result_is_not_cached():
+    async def run():
+        flight, source = SingleFlight(ttl=60), Source()
+        stale = asyncio.ensure_future(flight.do("blog:1", "blog", source.fetch))
+        await asyncio.sleep(0)
+        flight.invalidate("blog:1")
+        source.release.set()
+        assert await stale == "v0"
+        assert flight.stats()["cached"] == 0
+        source.value = "v1"
+        assert await flight.do("blog:1", "blog", source.fetch) == "v1"
+        assert flight.stats()["cache_hits"] == 0
+
+    asyncio.run(run())
+
+
+def test_invalidate_only_affects_its_tag():
+    async def run():
+        flight, source = SingleFlight(ttl=60), Source()
+        source.release.set()
+        await flight.do("blog:1", "blog", source.fetch)
+        await flight.do("blog:2", "blog", source.fetch)
+        flight.invalidate("blog:1")
+        await flight.do("blog:2", "blog", source.fetch)
+        assert flight.stats()["cache_hits"] == 1
+
+    asyncio.run(run())
@@ -0,0 +1,66 @@
+import io
+
+import pytest
+from starlette.applications import Starlette
+from starlette.datastructures import UploadFile
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from storage import RequestSizeLimit, UploadTooLarge, upload_file
+
+
+def _app(max_bytes):
+    reads = []
+
+    async def echo(request):
+        body = await request.body()
+        reads.append(len(body))
+        return JSONResponse({"size": len(body)})
+
+    app = Starlette(routes=[Route("/upload", echo, methods=["POST"])])
+    app.add_middleware(RequestSizeLimit, max_bytes=max_bytes)
+    return app, reads
+
+
+def test_rejects_by_content_length_without_reading_the_body():
+    app, reads = _app(max_bytes=10)
+    with TestClient(app) as client:
+        response = client.post("/upload", content=b"x" * 11)
+    assert response.status_code == 413
+    assert reads == []
+
+
+def test_rejects_streamed_body_once_it_passes_the_limit():
+    app, reads = _app(max_bytes=10)
+
+    def chunks():
+        yield b"x" * 6
+        yield b"x" * 6
+
+    with TestClient(app) as client:
+        # A generator body is sent chunked, without Content-Length
+        response = client.post("/upload", content=chunks())
+    assert response.status_code == 413
+    assert reads == []
+
+
+def test_passes_bodies_within_the_limit():
+    app, reads = _app(max_bytes=10)
+    with TestClient(app) as client:
+        response = client.post("/upload", content=b"x" * 10)
+    assert response.status_code == 200
+    assert reads == [10]
+
+
+def test_upload_file_checks_size_and_rewinds():
+    spooled = io.BytesIO(b"abcdef")
+    spooled.seek(4)
+    assert upload_file(UploadFile(spooled, size=6), max_bytes=6) is spooled
+    assert spooled.tell() == 0
+
+    with pytest.raises(UploadTooLarge):
+        upload_file(UploadFile(io.BytesIO(b"abcdef"), size=6), max_bytes=5)
+    # Without a recorded size the file itself is measured
+    with pytest.raises(UploadTooLarge):
+        upload_file(UploadFile(io.BytesIO(b"abcdef")), max_bytes=5)
@@ -0,0 +1,34 @@
+import asyncio
+
+from view_counter import ViewCounter
+
+
+class FakeBlogs:
+    def __init__(self):
+        self.writes = []
+        self.gate = asyncio.Event()
+
+    async def bulk_write(self, requests, ordered=True):
+        await self.gate.wait()
+        self.writes.append(len(requests))
+
+
+def test_full_buffer_schedules_one_tracked_flush():
+    async def run():
+        blogs = FakeBlogs()
+        counter = ViewCounter(blogs, max_buffer=2)
+        counter.record("a")
+        counter.record("b")
+        first = counter._flush_task
+        assert first is not None
+        await asyncio.sleep(0)
+        # A flush is still pending; another full buffer doesn't schedule a second one
+        counter.record("c")
+        counter.record("d")
+        assert counter._flush_task is first
+        blogs.gate.set()
+        await counter.stop()
+        assert blogs.writes == [2, 2]
+        assert counter._flush_task is None
+
+    asyncio.run(run())